@@ -0,0 +1,58 @@
+# _fixtures.py
+
+# ---------- Shared dummy worksheet for the test scripts ----------
+
+def dummy_result():
+    """
+    The tiny two-question worksheet used by the test scripts
+    (Q1 MCQ answered correctly, Q2 short answer answered wrongly).
+    """
+    from study_agents.question_generator_agent import Question
+    from study_agents.worksheet_loop import StudentAnswer, WorksheetResult
+
+    q1 = Question(
+        id=1,
+        q_type="mcq",
+        question_text="What is 1/2 + 1/4?",
+        options=["3/4", "1/4", "2/4"],
+        correct_option="3/4",
+        answer=None,
+        difficulty="easy",
+        skill_tag="fractions-addition",
+    )
+
+    q2 = Question(
+        id=2,
+        q_type="short",
+        question_text="Find 3/4 of 20.",
+        options=None,
+        correct_option=None,
+        answer="15",
+        difficulty="medium",
+        skill_tag="fractions-of-a-quantity",
+    )
+
+    # Student answers: one correct, one wrong
+    a1 = StudentAnswer(
+        question_id=1,
+        q_type="mcq",
+        student_answer="1",  # option 1 ("3/4") -> correct
+    )
+
+    a2 = StudentAnswer(
+        question_id=2,
+        q_type="short",
+        student_answer="12",  # incorrect (correct is 15)
+    )
+
+    return WorksheetResult(
+        questions=[q1, q2],
+        answers=[a1, a2],
+    )
+
+
+def dummy_evaluation():
+    """Evaluator Agent result for the dummy worksheet (one API call)."""
+    from study_agents.evaluator_agent import evaluate_worksheet
+
+    return evaluate_worksheet(dummy_result())
@@ -1,49 +1,36 @@
 # app.py
 
+from __future__ import annotations
+
+import logging
 import os
-from typing import Dict
+from typing import Dict, TYPE_CHECKING
 
 import streamlit as st
-from dotenv import load_dotenv
 
-from study_agents.question_generator_agent import QuestionSet, Question
-from services.study_flow import (
-    run_planning_and_generation,
-    run_full_analysis,
+from services.ui_helpers import (
+    load_api_key,
+    pack_analysis,
+    parse_evaluation,
+    parse_explanations,
+    parse_profile,
+    parse_progress_summary,
+    parse_report,
+    parse_worksheet_result,
 )
 
+# The agent stack (ADK, google-genai, every agent module) is imported lazily inside
+# the button handlers below, so the first render does not wait on it.
+if TYPE_CHECKING:
+    from study_agents.question_generator_agent import QuestionSet
 
-# ---------- Setup ----------
-def load_api_key():
-    # 1. Local dev / generic: load from .env first
-    load_dotenv()
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    if api_key:
-        return api_key
-
-    # 2. Streamlit Cloud: try secrets (or local secrets.toml if you ever add one)
-    try:
-        # Accessing st.secrets can raise if no secrets.toml exists
-        secrets = st.secrets  # this might throw StreamlitSecretNotFoundError
-        if "GOOGLE_API_KEY" in secrets:
-            api_key = secrets["GOOGLE_API_KEY"]
-            os.environ["GOOGLE_API_KEY"] = api_key
-            return api_key
-    except Exception:
-        # No secrets configured (normal for local dev without secrets.toml)
-        pass
-
-    # 3. If still not found, show an error in the UI
-    st.error(
-        "GOOGLE_API_KEY is not set.\n\n"
-        "Please either:\n"
-        "- Add it to a .env file locally, or\n"
-        "- Configure it in Streamlit Cloud secrets as GOOGLE_API_KEY."
-    )
-    return None
 
+# ---------- Setup ----------
 GOOGLE_API_KEY = load_api_key()
 
+# Agent diagnostics go through `logging`; raise the level with LOG_LEVEL=DEBUG
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "WARNING").upper())
+
 # Only for local setup
 # load_dotenv()
 
@@ -68,8 +55,23 @@ def init_session_state():
         st.session_state.qset: QuestionSet | None = None
     if "answers" not in st.session_state:
         st.session_state.answers: Dict[int, str] = {}
-    if "analysis" not in st.session_state:
-        st.session_state.analysis = None
+    if "analysis_blob" not in st.session_state:
+        st.session_state.analysis_blob: Dict[str, str] | None = None
+
+
+def collect_answers(qset: QuestionSet) -> Dict[int, str]:
+    """
+    Read the submitted worksheet widgets into {question_id: answer_text}.
+    MCQ answers are stored as the option number only (e.g. "1").
+    """
+    answers: Dict[int, str] = {}
+    for q in qset.questions:
+        if q.q_type == "mcq" and q.options:
+            selected = st.session_state.get(f"q_{q.id}_mcq")
+            answers[q.id] = selected.split(".")[0].strip() if selected else ""
+        else:
+            answers[q.id] = st.session_state.get(f"q_{q.id}_short", "")
+    return answers
 
 
 init_session_state()
@@ -89,6 +91,8 @@ difficulty = st.sidebar.selectbox("Difficulty", ["easy", "medium", "hard", "mixe
 if st.sidebar.button("1️⃣ Plan & Generate Questions"):
     with st.spinner("Calling Planner and Question Generator agents..."):
         try:
+            from services.study_flow import run_planning_and_generation
+
             result = run_planning_and_generation(
                 grade=grade,
                 subject=subject,
@@ -99,7 +103,9 @@ if st.sidebar.button("1️⃣ Plan & Generate Questions"):
             st.session_state.plan = result["plan"]
             st.session_state.qset = result["qset"]
             st.session_state.answers = {}
-            st.session_state.analysis = None
+            st.session_state.analysis_blob = None
+            # Class Mode results were for the previous worksheet
+            st.session_state.class_results = None
             st.success("Plan and questions generated!")
         except Exception as e:
             st.error(f"Error while generating plan/questions: {e}")
@@ -132,41 +138,37 @@ with col_questions:
         st.info("No questions yet. Generate a plan first.")
     else:
         with st.form(key="worksheet_form"):
-            for q in qset.questions:
-                st.markdown(f"**Q{q.id}.** {q.question_text}")
+            for i, q in enumerate(qset.questions):
+                # Previous question's separator rides along with this header (one message, not two)
+                st.markdown(("---\n\n" if i else "") + f"**Q{q.id}.** {q.question_text}")
 
                 if q.q_type == "mcq" and q.options:
                     # Use radio buttons with option labels
                     options = [f"{i+1}. {opt}" for i, opt in enumerate(q.options)]
-                    default_idx = 0
-                    selected = st.radio(
+                    st.radio(
                         f"Your answer for Q{q.id}",
                         options,
                         index=None,
                         key=f"q_{q.id}_mcq",
                     )
-                    if selected is None:
-                        answer_text = ""
-                    else:
-                        # store just the index+1 as string (e.g. "1")
-                        answer_text = selected.split(".")[0].strip()
                 else:
-                    answer_text = st.text_input(
+                    st.text_input(
                         f"Your answer for Q{q.id}",
                         value="",
                         key=f"q_{q.id}_short",
                     )
 
-                # Update in a local dict; we will commit on submission
-                st.session_state.answers[q.id] = answer_text
-
-                st.markdown("---")
+            st.markdown("---")
 
             submitted = st.form_submit_button("2️⃣ Submit Answers & Analyze")
 
         if submitted:
+            # The form only commits widget values on submit, so read them once here
+            st.session_state.answers = collect_answers(qset)
             with st.spinner("Evaluating answers and generating feedback..."):
                 try:
+                    from services.study_flow import run_full_analysis
+
                     analysis = run_full_analysis(
                         student_id=student_id,
                         grade=grade,
@@ -175,7 +177,7 @@ with col_questions:
                         qset=qset,
                         answers_by_qid=st.session_state.answers,
                     )
-                    st.session_state.analysis = analysis
+                    st.session_state.analysis_blob = pack_analysis(analysis)
                     st.success("Analysis complete!")
                 except Exception as e:
                     st.error(f"Error during analysis: {e}")
@@ -183,9 +185,9 @@ with col_questions:
 
 # ---------- Show Results (Evaluation, Explanations, Progress, Report) ----------
 
-analysis = st.session_state.analysis
+analysis_blob = st.session_state.analysis_blob
 
-if analysis is not None:
+if analysis_blob is not None:
     st.markdown("## 📊 Results & Feedback")
 
     tab_eval, tab_expl, tab_progress, tab_reports = st.tabs(
@@ -194,8 +196,8 @@ if analysis is not None:
 
     # ---- Scores Tab ----
     with tab_eval:
-        evaluation = analysis["evaluation"]
-        result = analysis["worksheet_result"]
+        evaluation, eval_by_qid = parse_evaluation(analysis_blob["evaluation"])
+        result = parse_worksheet_result(analysis_blob["worksheet_result"])
 
         st.subheader("Overall Score")
         st.write(
@@ -204,41 +206,49 @@ if analysis is not None:
         )
 
         st.subheader("Per-question Evaluation")
-        eval_by_qid = {ev.question_id: ev for ev in evaluation.evaluations}
-
+        # Build the whole list as one markdown string: one frontend message instead of ~7 per question
+        buf = []
         for q in result.questions:
             ev = eval_by_qid.get(q.id)
             if not ev:
                 continue
-            st.markdown(f"**Q{q.id}.** {q.question_text}")
-            st.write(f"- Your answer: `{ev.student_answer}`")
-            st.write(f"- Correct answer: `{ev.correct_answer}`")
-            st.write(f"- Score: **{ev.score} / {ev.max_score}**")
-            st.write(f"- Mistake type: `{ev.mistake_type}`")
-            st.write(f"- Feedback: {ev.feedback}")
-            st.markdown("---")
+            buf.append(
+                f"**Q{q.id}.** {q.question_text}\n\n"
+                f"- Your answer: `{ev.student_answer}`\n"
+                f"- Correct answer: `{ev.correct_answer}`\n"
+                f"- Score: **{ev.score} / {ev.max_score}**\n"
+                f"- Mistake type: `{ev.mistake_type}`\n"
+                f"- Feedback: {ev.feedback}\n\n"
+                "---"
+            )
+        if buf:
+            st.markdown("\n\n".join(buf))
 
     # ---- Explanations Tab ----
     with tab_expl:
-        explanations = analysis["explanations"]
         st.subheader("Hints & Explanations")
 
-        expl_by_qid = {e.question_id: e for e in explanations.explanations}
+        _, expl_by_qid = parse_explanations(analysis_blob["explanations"])
 
-        for q in analysis["worksheet_result"].questions:
+        buf = []
+        for q in parse_worksheet_result(analysis_blob["worksheet_result"]).questions:
             ex = expl_by_qid.get(q.id)
             if not ex:
                 continue
-            st.markdown(f"**Q{q.id}.** {q.question_text}")
-            st.write(f"**Hint:** {ex.short_hint}")
-            st.write("**Explanation:**")
-            st.write(ex.explanation)
-            st.markdown("---")
+            buf.append(
+                f"**Q{q.id}.** {q.question_text}\n\n"
+                f"**Hint:** {ex.short_hint}\n\n"
+                "**Explanation:**\n\n"
+                f"{ex.explanation}\n\n"
+                "---"
+            )
+        if buf:
+            st.markdown("\n\n".join(buf))
 
     # ---- Progress Tab ----
     with tab_progress:
-        profile = analysis["profile"]
-        progress_summary = analysis["progress_summary"]
+        profile = parse_profile(analysis_blob["profile"])
+        progress_summary = parse_progress_summary(analysis_blob["progress_summary"])
 
         st.subheader("Numeric Progress Profile")
         st.write(f"**Student:** {profile.student_id}")
@@ -249,18 +259,24 @@ if analysis is not None:
 
         for topic_name, tp in profile.topics.items():
             st.markdown(f"### Topic: {topic_name}")
-            rows = []
+            # Columnar lists: the DataFrame is built in one pass, no per-row dicts
+            skills, attempts, correct, accuracy = [], [], [], []
             for skill_tag, stat in tp.skills.items():
-                rows.append(
+                skills.append(skill_tag)
+                attempts.append(stat.attempts)
+                correct.append(stat.correct)
+                accuracy.append(stat.accuracy)
+            if skills:
+                st.dataframe(
                     {
-                        "Skill": skill_tag,
-                        "Attempts": stat.attempts,
-                        "Correct": stat.correct,
-                        "Accuracy (%)": stat.accuracy,
-                    }
+                        "Skill": skills,
+                        "Attempts": attempts,
+                        "Correct": correct,
+                        "Accuracy (%)": accuracy,
+                    },
+                    use_container_width=True,
+                    hide_index=True,
                 )
-            if rows:
-                st.table(rows)
 
         st.subheader("Narrative Summary")
         st.write(progress_summary.summary_text)
@@ -276,9 +292,9 @@ if analysis is not None:
     with tab_reports:
         st.subheader("Audience-specific Reports")
 
-        report_student = analysis["report_student"]
-        report_parent = analysis["report_parent"]
-        report_teacher = analysis["report_teacher"]
+        report_student = parse_report(analysis_blob["report_student"])
+        report_parent = parse_report(analysis_blob["report_parent"])
+        report_teacher = parse_report(analysis_blob["report_teacher"])
 
         r_tab_student, r_tab_parent, r_tab_teacher = st.tabs(
             ["👦 Student", "👪 Parent", "👩‍🏫 Teacher"]
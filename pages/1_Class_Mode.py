@@ -0,0 +1,177 @@
+# pages/1_Class_Mode.py
+
+from __future__ import annotations
+
+import csv
+import io
+from typing import Dict, List, TYPE_CHECKING
+
+import streamlit as st
+
+from services.ui_helpers import load_api_key, pack_analysis, parse_evaluation, parse_report
+
+if TYPE_CHECKING:
+    from study_agents.question_generator_agent import QuestionSet
+
+
+# ---------- Setup ----------
+# The main page normally loads the key; this covers opening Class Mode directly
+# (same .env / Streamlit secrets lookup as the main page).
+load_api_key()
+
+st.set_page_config(
+    page_title="AI Study Companion – Class Mode",
+    page_icon="👩‍🏫",
+    layout="wide",
+)
+
+
+# ---------- Helpers ----------
+
+def csv_template(qset: QuestionSet) -> str:
+    """
+    Header row (plus one example row) for the class submissions CSV.
+    """
+    header = ["student_id"] + [f"Q{q.id}" for q in qset.questions]
+    example = ["student_1"] + ["" for _ in qset.questions]
+    return ",".join(header) + "\n" + ",".join(example) + "\n"
+
+
+def parse_submissions(raw: bytes, qset: QuestionSet) -> List[Dict]:
+    """
+    Parse an uploaded CSV into [{"student_id": ..., "answers_by_qid": {...}}, ...].
+    Expects a student_id column and one Q<id> column per question; MCQ answers
+    are the option number (e.g. "2"), the same as in the worksheet form.
+    Raises ValueError if a student_id appears more than once, since each
+    submission updates that student's progress profile.
+    """
+    reader = csv.DictReader(io.StringIO(raw.decode("utf-8-sig")))
+    if not reader.fieldnames or "student_id" not in reader.fieldnames:
+        raise ValueError("CSV must have a 'student_id' column.")
+
+    submissions = []
+    seen, duplicates = set(), []
+    for row in reader:
+        student_id = (row.get("student_id") or "").strip()
+        if not student_id:
+            continue
+        if student_id in seen:
+            if student_id not in duplicates:
+                duplicates.append(student_id)
+            continue
+        seen.add(student_id)
+        answers_by_qid = {
+            q.id: (row.get(f"Q{q.id}") or "").strip() for q in qset.questions
+        }
+        submissions.append({"student_id": student_id, "answers_by_qid": answers_by_qid})
+
+    if duplicates:
+        raise ValueError(
+            "Each student_id may appear only once; duplicated: " + ", ".join(duplicates)
+        )
+    return submissions
+
+
+# ---------- Page ----------
+
+st.title("👩‍🏫 Class Mode – Analyse a whole class")
+
+qset: QuestionSet | None = st.session_state.get("qset")
+
+if qset is None:
+    st.info("Generate a worksheet on the main page first; Class Mode grades submissions for that worksheet.")
+    st.stop()
+
+st.sidebar.title("📋 Class Setup")
+grade = st.sidebar.selectbox("Grade", ["Year 3", "Year 4", "Year 5", "Year 6"], index=2)
+subject = st.sidebar.selectbox("Subject", ["Maths"], index=0)
+topic = st.sidebar.text_input("Topic", value="Fractions")
+
+st.write(f"Worksheet loaded with **{len(qset.questions)}** questions.")
+st.download_button(
+    "Download CSV template",
+    data=csv_template(qset),
+    file_name="class_submissions.csv",
+    mime="text/csv",
+)
+
+uploaded = st.file_uploader("Upload class submissions (CSV)", type=["csv"])
+uploaded_id = uploaded.file_id if uploaded is not None else None
+
+# Results belong to the CSV they came from; a new or removed upload clears them
+if st.session_state.get("class_results_file") != uploaded_id:
+    st.session_state.class_results = None
+    st.session_state.class_results_file = uploaded_id
+
+if uploaded is not None and st.button("Analyse class"):
+    try:
+        submissions = parse_submissions(uploaded.getvalue(), qset)
+    except Exception as e:
+        st.error(f"Could not read CSV: {e}")
+        st.stop()
+
+    if not submissions:
+        st.warning("No student rows found in the CSV.")
+        st.stop()
+
+    with st.spinner(f"Analysing {len(submissions)} submissions..."):
+        from services.study_flow import run_full_analysis_batch
+
+        jobs = [
+            {
+                "student_id": sub["student_id"],
+                "grade": grade,
+                "subject": subject,
+                "topic": topic,
+                "qset": qset,
+                "answers_by_qid": sub["answers_by_qid"],
+            }
+            for sub in submissions
+        ]
+        # Stored as JSON blobs, like the main page's analysis (see pack_analysis)
+        st.session_state.class_results = [
+            (sub["student_id"], {"error": a["error"]} if "error" in a else pack_analysis(a))
+            for sub, a in zip(submissions, run_full_analysis_batch(jobs))
+        ]
+
+
+# ---------- Results ----------
+
+class_results = st.session_state.get("class_results")
+
+if class_results:
+    st.markdown("## 📊 Class Results")
+
+    student_ids, scores, percentages, headlines = [], [], [], []
+    for student_id, analysis in class_results:
+        student_ids.append(student_id)
+        if "error" in analysis:
+            scores.append("—")
+            percentages.append(None)
+            headlines.append(f"Error: {analysis['error']}")
+            continue
+        summary = parse_evaluation(analysis["evaluation"])[0].summary
+        scores.append(f"{summary.total_score} / {summary.max_score}")
+        percentages.append(summary.percentage)
+        headlines.append(parse_report(analysis["report_teacher"]).headline)
+
+    st.dataframe(
+        {
+            "Student": student_ids,
+            "Score": scores,
+            "Percentage": percentages,
+            "Teacher headline": headlines,
+        },
+        use_container_width=True,
+    )
+
+    for student_id, analysis in class_results:
+        if "error" in analysis:
+            continue
+        r = parse_report(analysis["report_teacher"])
+        with st.expander(f"{student_id} – teacher report"):
+            st.markdown(f"### {r.headline}")
+            st.write("**Strengths:**", r.strengths_sentence)
+            st.write("**Areas to improve:**", r.weaknesses_sentence)
+            st.write("**Next steps:**", r.next_steps_sentence)
+            st.markdown("\n".join(f"- {bp}" for bp in r.bullet_points))
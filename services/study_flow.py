@@ -1,6 +1,12 @@
 # services/study_flow.py
 
-from typing import Dict, Any
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import streamlit as st
 
 from study_agents.planner_agent import get_study_plan, StudyPlan
 from study_agents.question_generator_agent import (
@@ -12,20 +18,247 @@ from study_agents.worksheet_loop import (
     StudentAnswer,
     WorksheetResult,
 )
-from study_agents.evaluator_agent import evaluate_worksheet, WorksheetEvaluation
-from study_agents.explanation_agent import (
-    generate_explanations,
-    ExplanationSet,
+from study_agents.evaluator_agent import (
+    WorksheetEvaluation,
+    QuestionEvaluation,
+    EvaluationSummary,
+)
+from study_agents.explanation_agent import ExplanationSet
+from study_agents.eval_explain_agent import (
+    evaluate_and_explain,
+    EvalExplainBundle,
 )
 from study_agents.progress_agent import (
-    generate_progress_summary,
+    load_progress_profile,
+    update_profile_with_session,
     ProgressProfile,
     ProgressSummary,
 )
-from study_agents.report_agent import (
-    generate_report,
-    Report,
-)
+from study_agents.report_agent import Report
+from study_agents.debrief_agent import generate_full_debrief, Debrief
+
+log = logging.getLogger(__name__)
+
+
+# ---------- Cached LLM calls ----------
+# Identical inputs (same grade/topic/settings, same submitted worksheet, ...)
+# return the previous agent output instead of calling Gemini again.
+# Pydantic inputs are passed in as JSON strings so they hash cheaply and stably,
+# and outputs are cached as JSON bytes and parsed again at the call site.
+
+CACHE_TTL_SECONDS = 3600
+CACHE_MAX_ENTRIES = 256
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def _cached_plan(
+    grade: str,
+    subject: str,
+    topic: str,
+    time_minutes: int,
+    difficulty: str,
+) -> bytes:
+    plan = get_study_plan(
+        grade=grade,
+        subject=subject,
+        topic=topic,
+        time_minutes=time_minutes,
+        difficulty=difficulty,
+    )
+    return plan.model_dump_json().encode()
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def _cached_questions(plan_json: str, grade: str, subject: str, topic: str) -> bytes:
+    qset = generate_questions(
+        plan=StudyPlan.model_validate_json(plan_json),
+        grade=grade,
+        subject=subject,
+        topic=topic,
+    )
+    return qset.model_dump_json().encode()
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def _cached_eval_explain(result_json: str, _result: WorksheetResult) -> bytes:
+    # `_result` is the object behind `result_json`; the leading underscore keeps it
+    # out of the cache key, and passing both avoids re-parsing or re-serializing.
+    bundle = _evaluate_and_explain_with_local_mcqs(_result, result_json)
+    return bundle.model_dump_json().encode()
+
+
+# ---------- Helper: Deterministic MCQ grading ----------
+# MCQ answers are a plain option match, so they are scored here and only the
+# short-answer questions are left for the LLM to evaluate.
+
+def _normalize_answer(text: Optional[str]) -> str:
+    return " ".join((text or "").split()).lower()
+
+
+def _resolve_option(q: Question, answer: str, number_first: bool = False) -> Optional[str]:
+    """
+    Map an MCQ answer to the option text it refers to.
+    Accepts the option text itself, its 1-based number ("2") or its letter ("B").
+    Option text is tried before the number, unless `number_first` is set: student
+    answers are option numbers (the app's radio and Class Mode CSVs), which must win
+    when an option's text is itself a number.
+    Returns None if the answer cannot be matched to an option.
+    """
+    options = q.options or []
+    norm = _normalize_answer(answer)
+    if not norm:
+        return None
+
+    by_number = options[int(norm) - 1] if norm.isdigit() and 1 <= int(norm) <= len(options) else None
+    if number_first and by_number is not None:
+        return by_number
+    for opt in options:
+        if _normalize_answer(opt) == norm:
+            return opt
+    if by_number is not None:
+        return by_number
+    if len(norm) == 1 and "a" <= norm <= "z" and ord(norm) - ord("a") < len(options):
+        return options[ord(norm) - ord("a")]
+    return None
+
+
+def _grade_mcqs_locally(
+    result: WorksheetResult,
+) -> Tuple[List[QuestionEvaluation], List[Question]]:
+    """
+    Score MCQ answers in Python.
+
+    Returns:
+      (evaluations for the MCQs that could be graded,
+       questions that still need the LLM: short answers and any unresolvable MCQ)
+    """
+    answers_by_id = result.answers_by_id
+    graded: List[QuestionEvaluation] = []
+    remaining: List[Question] = []
+
+    for q in result.questions:
+        correct = _resolve_option(q, q.correct_option or "") if q.q_type == "mcq" else None
+        if correct is None:
+            remaining.append(q)
+            continue
+
+        answer = answers_by_id.get(q.id)
+        student_answer = answer.student_answer if answer is not None else ""
+        chosen = _resolve_option(q, student_answer, number_first=True)
+        if not student_answer.strip():
+            score, mistake_type, feedback = 0.0, "blank", "No option was chosen. Review the options again."
+        elif chosen == correct:
+            score, mistake_type, feedback = 1.0, "correct", "Correct choice."
+        else:
+            score, mistake_type, feedback = 0.0, "incorrect", "Review the options again."
+
+        graded.append(
+            QuestionEvaluation(
+                question_id=q.id,
+                q_type=q.q_type,
+                student_answer=student_answer,
+                correct_answer=correct,
+                score=score,
+                max_score=1.0,
+                mistake_type=mistake_type,
+                feedback=feedback,
+            )
+        )
+
+    return graded, remaining
+
+
+def _merge_evaluations(
+    result: WorksheetResult,
+    local: List[QuestionEvaluation],
+    llm: List[QuestionEvaluation],
+) -> WorksheetEvaluation:
+    """
+    Combine locally graded and LLM-graded evaluations in worksheet order and
+    recompute the summary from the per-question scores.
+    A question the LLM left out gets a zero-score "other" evaluation, so it
+    still counts towards total_questions and max_score.
+    """
+    by_qid = {ev.question_id: ev for ev in llm}
+    by_qid.update({ev.question_id: ev for ev in local})  # local MCQ grading wins
+
+    answers_by_id = result.answers_by_id
+    evaluations = []
+    for q in result.questions:
+        ev = by_qid.get(q.id)
+        if ev is None:
+            log.warning("Eval + explain agent returned no evaluation for Q%s", q.id)
+            answer = answers_by_id.get(q.id)
+            ev = QuestionEvaluation(
+                question_id=q.id,
+                q_type=q.q_type,
+                student_answer=answer.student_answer if answer is not None else "",
+                correct_answer=q.answer or q.correct_option or "",
+                score=0.0,
+                max_score=1.0,
+                mistake_type="other",
+                feedback="This answer could not be checked automatically. Ask your teacher to review it.",
+            )
+        evaluations.append(ev)
+
+    total_score = sum(ev.score for ev in evaluations)
+    max_score = sum(ev.max_score for ev in evaluations)
+
+    return WorksheetEvaluation(
+        evaluations=evaluations,
+        summary=EvaluationSummary(
+            total_questions=len(evaluations),
+            total_score=total_score,
+            max_score=max_score,
+            percentage=round(total_score / max_score * 100.0, 2) if max_score else 0.0,
+        ),
+    )
+
+
+def _evaluate_and_explain_with_local_mcqs(
+    result: WorksheetResult,
+    result_json: str,
+) -> EvalExplainBundle:
+    """
+    Grade MCQs locally, let the Eval + Explain Agent score the rest and explain
+    everything, then merge both into one bundle.
+    Only the remaining questions are sent for evaluation; the locally graded
+    ones go along in compact form (as pre_graded) so they are still explained.
+    """
+    local, remaining = _grade_mcqs_locally(result)
+    bundle = evaluate_and_explain(
+        result,
+        # The full worksheet JSON is only the right payload if nothing was graded here
+        result_json=result_json if len(remaining) == len(result.questions) else None,
+        pre_graded=local,
+    )
+    evaluation = _merge_evaluations(result, local, bundle.evaluation.evaluations)
+    return EvalExplainBundle(evaluation=evaluation, explanations=bundle.explanations)
+
+
+# ---------- Gemini concurrency limit ----------
+# Single knob for how many agent calls may be in flight at once (per process), to stay
+# under the Gemini per-minute request quota once several calls are fanned out.
+# A threading semaphore (taken inside the worker thread) is used rather than an
+# asyncio.Semaphore because each analysis runs in its own asyncio.run() event loop.
+
+GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "4"))
+
+_gemini_slots = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENCY)
+
+T = TypeVar("T")
+
+
+async def _to_thread_bounded(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    asyncio.to_thread, but the call waits for a free Gemini slot before running.
+    """
+
+    def _call() -> T:
+        with _gemini_slots:
+            return func(*args, **kwargs)
+
+    return await asyncio.to_thread(_call)
 
 
 # ---------- Helper: Build WorksheetResult from UI answers ----------
@@ -77,19 +310,23 @@ def run_planning_and_generation(
         "qset": QuestionSet,
       }
     """
-    plan: StudyPlan = get_study_plan(
-        grade=grade,
-        subject=subject,
-        topic=topic,
-        time_minutes=time_minutes,
-        difficulty=difficulty,
+    plan: StudyPlan = StudyPlan.model_validate_json(
+        _cached_plan(
+            grade=grade,
+            subject=subject,
+            topic=topic,
+            time_minutes=time_minutes,
+            difficulty=difficulty,
+        )
     )
 
-    qset: QuestionSet = generate_questions(
-        plan=plan,
-        grade=grade,
-        subject=subject,
-        topic=topic,
+    qset: QuestionSet = QuestionSet.model_validate_json(
+        _cached_questions(
+            plan_json=plan.model_dump_json(),
+            grade=grade,
+            subject=subject,
+            topic=topic,
+        )
     )
 
     return {
@@ -100,7 +337,7 @@ def run_planning_and_generation(
 
 # ---------- Stage 2: Full analysis after student answers ----------
 
-def run_full_analysis(
+async def arun_full_analysis(
     student_id: str,
     grade: str,
     subject: str,
@@ -111,10 +348,11 @@ def run_full_analysis(
     """
     Orchestrates:
       1) Build WorksheetResult
-      2) Evaluator Agent
-      3) Explanation Agent
-      4) Progress Agent (numeric + narrative)
-      5) Report Agent (student view by default)
+      2) Eval + Explain Agent (scores and explanations in a single LLM call;
+         MCQs are graded locally and only explained by the agent)
+      3) Numeric progress profile update (no LLM)
+      4) Debrief Agent (narrative progress summary + student, parent and
+         teacher reports in a single LLM call)
 
     Returns:
       {
@@ -132,40 +370,35 @@ def run_full_analysis(
     # 1) Build WorksheetResult from answers
     result: WorksheetResult = build_worksheet_result_from_answers(qset, answers_by_qid)
 
-    # 2) Evaluate answers
-    evaluation: WorksheetEvaluation = evaluate_worksheet(result)
-
-    # 3) Generate explanations
-    explanations: ExplanationSet = generate_explanations(result, evaluation)
-
-    # 4) Update progress + narrative summary
-    profile: ProgressProfile
-    progress_summary: ProgressSummary
-    profile, progress_summary = generate_progress_summary(
-        student_id=student_id,
-        grade=grade,
-        subject=subject,
-        topic=topic,
-        result=result,
-        evaluation=evaluation,
+    # 2) Evaluate answers and generate explanations in one round-trip
+    # Serialize the worksheet once: it is both the cache key and the prompt payload
+    result_json = result.model_dump_json()
+    bundle: EvalExplainBundle = EvalExplainBundle.model_validate_json(
+        await _to_thread_bounded(_cached_eval_explain, result_json, result)
     )
+    evaluation: WorksheetEvaluation = bundle.evaluation
+    explanations: ExplanationSet = bundle.explanations
 
-    # 5) Generate three reports for different audiences
-    report_student: Report = generate_report(
-        profile=profile,
-        progress_summary=progress_summary,
-        audience="student",
+    # 3) Update the numeric progress profile with this session
+    profile: ProgressProfile = update_profile_with_session(
+        load_progress_profile(student_id, grade, subject),
+        topic,
+        result,
+        evaluation,
     )
-    report_parent: Report = generate_report(
-        profile=profile,
-        progress_summary=progress_summary,
-        audience="parent",
-    )
-    report_teacher: Report = generate_report(
+
+    # 4) Progress summary + the three audience reports in one round-trip
+    # (not cached: the profile, including total_sessions, changes every session)
+    debrief: Debrief = await _to_thread_bounded(
+        generate_full_debrief,
         profile=profile,
-        progress_summary=progress_summary,
-        audience="teacher",
+        evaluation=evaluation,
+        audiences=("student", "parent", "teacher"),
     )
+    progress_summary: ProgressSummary = debrief.progress_summary
+    report_student: Report = debrief.reports["student"]
+    report_parent: Report = debrief.reports["parent"]
+    report_teacher: Report = debrief.reports["teacher"]
 
     return {
         "worksheet_result": result,
@@ -176,4 +409,70 @@ def run_full_analysis(
         "report_student": report_student,
         "report_parent": report_parent,
         "report_teacher": report_teacher,
-    }
\ No newline at end of file
+    }
+
+
+def run_full_analysis(
+    student_id: str,
+    grade: str,
+    subject: str,
+    topic: str,
+    qset: QuestionSet,
+    answers_by_qid: Dict[int, str],
+) -> Dict[str, Any]:
+    """
+    Synchronous entry point for Stage 2 (used by the Streamlit UI).
+    See arun_full_analysis for the orchestration details and return value.
+    """
+    return asyncio.run(
+        arun_full_analysis(
+            student_id=student_id,
+            grade=grade,
+            subject=subject,
+            topic=topic,
+            qset=qset,
+            answers_by_qid=answers_by_qid,
+        )
+    )
+
+
+# ---------- Stage 2 (batch): Analyse a whole class at once ----------
+
+async def arun_full_analysis_batch(
+    jobs: List[Dict[str, Any]],
+    max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """
+    Run arun_full_analysis for many submissions concurrently (e.g. a whole class).
+
+    - jobs: one dict per submission with the arun_full_analysis keyword arguments
+      (student_id, grade, subject, topic, qset, answers_by_qid).
+    - max_concurrency: how many submissions are analysed at the same time.
+      Individual agent calls are additionally bounded by GEMINI_MAX_CONCURRENCY.
+
+    Returns one analysis dict per job, in the same order as `jobs`.
+    A job that fails returns {"error": "<message>"} instead, so one bad
+    submission does not lose the rest of the class.
+    Jobs should use distinct student_ids, since each one updates that student's profile.
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def _run_one(job: Dict[str, Any]) -> Dict[str, Any]:
+        async with sem:
+            try:
+                return await arun_full_analysis(**job)
+            except Exception as e:
+                return {"error": str(e)}
+
+    return await asyncio.gather(*(_run_one(job) for job in jobs))
+
+
+def run_full_analysis_batch(
+    jobs: List[Dict[str, Any]],
+    max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """
+    Synchronous entry point for batch Stage 2 (used by the Class Mode page).
+    See arun_full_analysis_batch for details.
+    """
+    return asyncio.run(arun_full_analysis_batch(jobs, max_concurrency=max_concurrency))
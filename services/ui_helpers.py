@@ -0,0 +1,96 @@
+# services/ui_helpers.py
+
+import os
+from typing import Dict
+
+import streamlit as st
+from dotenv import load_dotenv
+
+
+# ---------- API key (shared by every Streamlit page) ----------
+
+def load_api_key():
+    # 1. Local dev / generic: load from .env first
+    load_dotenv()
+    api_key = os.environ.get("GOOGLE_API_KEY")
+    if api_key:
+        return api_key
+
+    # 2. Streamlit Cloud: try secrets (or local secrets.toml if you ever add one)
+    try:
+        # Accessing st.secrets can raise if no secrets.toml exists
+        secrets = st.secrets  # this might throw StreamlitSecretNotFoundError
+        if "GOOGLE_API_KEY" in secrets:
+            api_key = secrets["GOOGLE_API_KEY"]
+            os.environ["GOOGLE_API_KEY"] = api_key
+            return api_key
+    except Exception:
+        # No secrets configured (normal for local dev without secrets.toml)
+        pass
+
+    # 3. If still not found, show an error in the UI
+    st.error(
+        "GOOGLE_API_KEY is not set.\n\n"
+        "Please either:\n"
+        "- Add it to a .env file locally, or\n"
+        "- Configure it in Streamlit Cloud secrets as GOOGLE_API_KEY."
+    )
+    return None
+
+
+# ---------- Analysis storage ----------
+# The analysis is kept in session state as JSON strings rather than live pydantic
+# objects; each view re-hydrates only what it shows through a cached parser.
+
+def pack_analysis(analysis: Dict) -> Dict[str, str]:
+    """
+    Serialize every pydantic object of a run_full_analysis result to JSON.
+    The per-question lookups are built on parse (parse_evaluation, parse_explanations).
+    """
+    return {k: v.model_dump_json() for k, v in analysis.items() if hasattr(v, "model_dump_json")}
+
+
+@st.cache_data(show_spinner=False)
+def parse_worksheet_result(blob: str):
+    from study_agents.worksheet_loop import WorksheetResult
+
+    return WorksheetResult.model_validate_json(blob)
+
+
+@st.cache_data(show_spinner=False)
+def parse_evaluation(blob: str):
+    """Returns (WorksheetEvaluation, {question_id: QuestionEvaluation})."""
+    from study_agents.evaluator_agent import WorksheetEvaluation
+
+    evaluation = WorksheetEvaluation.model_validate_json(blob)
+    return evaluation, {ev.question_id: ev for ev in evaluation.evaluations}
+
+
+@st.cache_data(show_spinner=False)
+def parse_explanations(blob: str):
+    """Returns (ExplanationSet, {question_id: QuestionExplanation})."""
+    from study_agents.explanation_agent import ExplanationSet
+
+    explanations = ExplanationSet.model_validate_json(blob)
+    return explanations, {e.question_id: e for e in explanations.explanations}
+
+
+@st.cache_data(show_spinner=False)
+def parse_profile(blob: str):
+    from study_agents.progress_agent import ProgressProfile
+
+    return ProgressProfile.model_validate_json(blob)
+
+
+@st.cache_data(show_spinner=False)
+def parse_progress_summary(blob: str):
+    from study_agents.progress_agent import ProgressSummary
+
+    return ProgressSummary.model_validate_json(blob)
+
+
+@st.cache_data(show_spinner=False)
+def parse_report(blob: str):
+    from study_agents.report_agent import Report
+
+    return Report.model_validate_json(blob)
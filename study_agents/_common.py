@@ -0,0 +1,294 @@
+# study_agents/_common.py
+# Infrastructure shared by every agent module: the Gemini client, the ADK session
+# service, the run helpers, prompt payload helpers and JSON extraction.
+
+import re
+from typing import Dict, Optional
+import os
+import json
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import contextlib
+import ssl
+import uuid
+import contextvars
+import certifi
+from google.adk.models import Gemini
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google import genai
+from google.genai import types
+
+log = logging.getLogger(__name__)
+
+# Gemini API clients -- one per agent call.
+# SharedGemini models are module-level and outlive any one event loop (each sync entry
+# point's asyncio.run starts and closes its own), so they cannot keep ADK's per-model
+# cached client: its async connections would be reused on a closed loop. Instead each
+# arun_to_final_text call gets its own client, closed when the call ends. The SSL
+# context is what is shared: it roughly halves client setup (~40 ms -> ~20 ms here).
+_call_clients: contextvars.ContextVar[Optional[Dict[tuple, genai.Client]]] = contextvars.ContextVar(
+    "_call_clients", default=None
+)
+
+@functools.lru_cache(maxsize=1)
+def _gemini_ssl_context() -> ssl.SSLContext:
+    """
+    SSL context shared by all the clients (built the way google-genai builds its
+    default one). Loading the CA bundle is the slow part of client setup, so it is
+    done once per process rather than once per client.
+    """
+    return ssl.create_default_context(
+        cafile=os.environ.get("SSL_CERT_FILE", certifi.where()),
+        capath=os.environ.get("SSL_CERT_DIR"),
+    )
+
+
+def new_genai_client(
+    headers: Optional[Dict[str, str]] = None,
+    retry_options: Optional[types.HttpRetryOptions] = None,
+) -> genai.Client:
+    """Build a genai.Client that uses the shared SSL context."""
+    client_args = {"verify": _gemini_ssl_context()}
+    return genai.Client(
+        http_options=types.HttpOptions(
+            headers=headers,
+            retry_options=retry_options,
+            client_args=client_args,
+            async_client_args=client_args,
+        )
+    )
+
+
+class SharedGemini(Gemini):
+    """
+    ADK Gemini model whose genai.Client belongs to the current agent call (see
+    arun_to_final_text) and uses the shared SSL context. ADK's tracking headers
+    and retry_options are kept.
+    """
+
+    @property
+    def api_client(self) -> genai.Client:
+        key = (
+            tuple(sorted(self._tracking_headers.items())),
+            self.retry_options.model_dump_json() if self.retry_options is not None else None,
+        )
+        clients = _call_clients.get()
+        if clients is None:
+            # Outside an agent call (no requests are sent from here)
+            return new_genai_client(self._tracking_headers, self.retry_options)
+        if key not in clients:
+            clients[key] = new_genai_client(self._tracking_headers, self.retry_options)
+        return clients[key]
+
+
+# Shared ADK session service; every agent runner is built on it
+APP_NAME = "study_companion_app"
+USER_ID = "demo_user"
+
+session_service = InMemorySessionService()
+
+# Process-wide cache for agent/runner construction shared by the other agents.
+# Under Streamlit this is st.cache_resource (one object per server process, shared
+# across sessions); plain Python callers (scripts, tests) fall back to lru_cache.
+try:
+    import streamlit as st
+
+    cache_resource = st.cache_resource
+except ImportError:
+    def cache_resource(func):
+        return functools.lru_cache(maxsize=1)(func)
+
+# Helpers for one-shot agent calls -- a fresh session per call
+# Every agent call is an independent request. Reusing one session would make ADK send
+# the whole growing event history with each prompt, so each call gets a throwaway
+# session that is deleted afterwards: the input is just the instruction + this prompt.
+@contextlib.asynccontextmanager
+async def aephemeral_session(service=None):
+    """
+    Create a new session (random id) for a single agent call, yield its id,
+    and delete it when the block exits.
+    """
+    service = service or session_service
+    session_id = uuid.uuid4().hex
+    await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    try:
+        yield session_id
+    finally:
+        await service.delete_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+
+
+# Helpers for running an agent -- return the first final response and stop there
+async def arun_to_final_text(
+    runner: Runner,
+    content: types.Content,
+    session_id: Optional[str] = None,
+):
+    """
+    Run `runner` on `content` (runner.run_async) and return the text of the first
+    final response (None if there is none). Closing the event generator right
+    after it cancels the rest of the run, including the model stream. The call's
+    genai.Client (see SharedGemini) is closed at the end.
+
+    Without a `session_id` the call runs in its own ephemeral session.
+    """
+    if session_id is None:
+        async with aephemeral_session(runner.session_service) as sid:
+            return await arun_to_final_text(runner, content, session_id=sid)
+
+    clients = {}
+    token = _call_clients.set(clients)
+    events = runner.run_async(user_id=USER_ID, session_id=session_id, new_message=content)
+    try:
+        async for event in events:
+            if event.is_final_response() and event.content and event.content.parts:
+                return event.content.parts[0].text.strip()
+    finally:
+        await events.aclose()
+        _call_clients.reset(token)
+        for client in clients.values():
+            await client.aio.aclose()
+    return None
+
+
+def run_to_final_text(
+    runner: Runner,
+    content: types.Content,
+    session_id: Optional[str] = None,
+):
+    """
+    Synchronous wrapper around arun_to_final_text (for the sync agent functions).
+    Goes through the async session API (ADK's *_sync session methods are deprecated)
+    and, like the async version, stops the run at the first final response.
+    Called from inside a running event loop, it runs on a worker thread instead.
+    """
+    coro = arun_to_final_text(runner, content, session_id=session_id)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+# Helper for prompts -- one user message from a fixed prefix + payload text
+def user_message(*pieces: str) -> types.Content:
+    """
+    Build the user Content for an agent call. The prompt pieces (a module-level
+    prefix constant, then the payload JSON) are joined in one step.
+    """
+    return types.Content(role="user", parts=[types.Part(text="".join(pieces))])
+
+# Helper for prompts -- compact JSON payloads
+def dumps_compact(payload) -> str:
+    """
+    Serialize a prompt payload without indentation or spaces after separators
+    (pretty-printing only adds billed whitespace tokens). Keys are sorted so equal
+    payloads always produce the same prompt text.
+    """
+    return json.dumps(payload, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+
+# Helper for prompt budgets -- local token estimate
+# Gemini averages roughly 4 characters per token on English text and JSON. A local
+# estimate is enough to keep prompts bounded and avoids a count_tokens round trip.
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for `text`, computed locally."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+# Helpers for model output -- Ensuring only JSON output
+
+# Compiled once at import instead of on every parse
+_FENCE_RE = re.compile(r"^```[a-zA-Z0-9_+-]*\s*")
+# raw_decode parses one JSON value from a given offset and ignores what follows it
+_JSON_DECODER = json.JSONDecoder()
+
+def extract_json_from_text(text: str) -> dict:
+    """
+    Try to extract a JSON object from the model's text output.
+    Handles code fences and extra narration.
+    """
+    if not text:
+        raise ValueError("Model returned empty response text.")
+
+    raw = text.strip()
+
+    # If wrapped in ```...```, strip the fences first
+    if raw.startswith("```"):
+        # remove starting fence with optional language label
+        raw = _FENCE_RE.sub("", raw, count=1)
+        # remove trailing fence
+        if raw.endswith("```"):
+            raw = raw[:-3].strip()
+
+    # Find the first '{' and parse the object straight from there (single pass;
+    # narration or a fence after the closing '}' is simply not read)
+    start = raw.find("{")
+
+    if start == -1:
+        log.warning("Could not locate JSON braces in output. Full text was:\n%s", raw)
+        raise ValueError("Could not find JSON object in LLM output.")
+
+    obj, _end = _JSON_DECODER.raw_decode(raw, start)
+    return obj
+
+# Characters that matter for brace matching; everything else is skipped in bulk
+_JSON_SCAN_RE = re.compile(r'[{}"\\]')
+
+def _first_json_object(s: str) -> tuple[int, int]:
+    """
+    Return the (start, end) span of the first balanced top-level {...} in `s`,
+    or (-1, -1) if there is none. Single pass; braces inside strings are ignored.
+    """
+    start = s.find("{")
+    if start == -1:
+        return -1, -1
+
+    depth = 0
+    in_string = False
+    skip = -1  # index of a character escaped by a backslash
+    for m in _JSON_SCAN_RE.finditer(s, start):
+        i = m.start()
+        if i == skip:
+            continue
+        ch = s[i]
+        if in_string:
+            if ch == "\\":
+                skip = i + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return start, i + 1
+    return -1, -1
+
+def extract_json_text(text: str) -> str:
+    """
+    Like extract_json_from_text, but return the JSON object's text instead of
+    parsing it, for `Model.model_validate_json` (pydantic-core parses and
+    validates in one pass, without building an intermediate dict).
+    """
+    if not text:
+        raise ValueError("Model returned empty response text.")
+
+    raw = text.strip()
+
+    if raw.startswith("```"):
+        raw = _FENCE_RE.sub("", raw, count=1)
+
+    # First balanced object, so a '}' in trailing narration or a second object
+    # is not swept in; the validator rejects anything malformed in between
+    start, end = _first_json_object(raw)
+
+    if start == -1:
+        log.warning("Could not locate JSON braces in output. Full text was:\n%s", raw)
+        raise ValueError("Could not find JSON object in LLM output.")
+
+    return raw[start:end]
@@ -0,0 +1,24 @@
+# study_agents/_env.py
+
+import functools
+import os
+
+from dotenv import load_dotenv
+
+
+# ---------- Environment setup for scripts ----------
+
+@functools.lru_cache(maxsize=1)
+def ensure_env() -> str:
+    """
+    Load .env (once per process) and return GOOGLE_API_KEY.
+    Raises RuntimeError if the key is not set.
+
+    Agent modules read settings from the environment at import time, so scripts
+    call this first and import them afterwards (inside main()).
+    """
+    load_dotenv()
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise RuntimeError("GOOGLE_API_KEY is not set. Check .env file.")
+    return api_key
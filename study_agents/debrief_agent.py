@@ -0,0 +1,205 @@
+# study_agents/debrief_agent.py
+
+from typing import Dict, Sequence
+
+from pydantic import BaseModel, Field
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+
+from study_agents._common import (
+    APP_NAME,
+    SharedGemini,
+    cache_resource,
+    dumps_compact,
+    user_message,
+    extract_json_from_text,
+    session_service as shared_session_service,
+    run_to_final_text,
+)
+from study_agents.evaluator_agent import WorksheetEvaluation
+from study_agents.progress_agent import ProgressProfile, ProgressSummary, profile_for_prompt
+from study_agents.report_agent import Audience, Report, VALID_AUDIENCES
+
+
+# ---------- Debrief Model (progress summary + reports) ----------
+
+class Debrief(BaseModel):
+    progress_summary: ProgressSummary = Field(
+        description="Narrative summary of the student's progress and recommendations."
+    )
+    reports: Dict[str, Report] = Field(
+        description="Mapping from audience ('student', 'parent', 'teacher') to its Report."
+    )
+
+
+# ---------- Debrief Agent Instruction ----------
+
+DEBRIEF_INSTRUCTION = """
+You are a progress analysis and report-writing agent for an AI Study Companion.
+
+You are given:
+1. A numeric progress_profile object (already updated with the latest session):
+   - student_id
+   - grade
+   - subject
+   - topics: a mapping from topic name to:
+     - skills: mapping from skill_tag to:
+       - attempts
+       - correct
+       - accuracy (percentage)
+   - total_sessions
+   - last_topic
+   - last_percentage
+
+2. The latest worksheet_evaluation object:
+   - evaluations: per-question evaluations (including mistake_type and feedback)
+   - summary: total_questions, total_score, max_score, percentage
+
+3. A numbered list of report audiences, each one of "student", "parent" or "teacher".
+
+Your tasks, in order:
+
+PART A – Progress summary.
+- Analyze the student's current strengths and weaknesses based on:
+  - skill accuracies
+  - recent performance in last_topic
+  - mistake types (conceptual-error, calculation-error, etc.)
+- Produce:
+  - summary_text: 2–4 sentences summarizing performance.
+  - strengths: list of skills or topics where the student is strong.
+  - weaknesses: list of skills or topics that need more practice.
+  - recommended_next_topics: list of topics/skills to focus on next, in order of priority.
+  - motivational_message: a short, encouraging note appropriate for the student's age/grade.
+
+PART B – One report for EACH listed audience, based on the profile and your PART A summary.
+- The reports share the same facts but differ in tone and focus:
+  - "student": friendly, encouraging, speaks directly to the student ("You are...", "You can...").
+  - "parent": slightly more formal; how the child is progressing and what support might help at home.
+  - "teacher": skills, accuracy trends and next instructional steps; concise and professional.
+- For each report:
+  - headline: 1 short sentence capturing current status.
+  - strengths_sentence: 1 sentence summarizing strengths.
+  - weaknesses_sentence: 1 sentence summarizing key areas to work on.
+  - next_steps_sentence: 1 sentence suggesting focus for the next few sessions.
+  - bullet_points: 3–6 short bullet points; each should be a crisp, standalone point.
+
+You must output ONLY a JSON object with the following structure:
+
+{
+  "progress_summary": {
+    "summary_text": "...",
+    "strengths": ["...", "..."],
+    "weaknesses": ["...", "..."],
+    "recommended_next_topics": ["...", "..."],
+    "motivational_message": "..."
+  },
+  "reports": {
+    "student": {
+      "audience": "student",
+      "headline": "...",
+      "strengths_sentence": "...",
+      "weaknesses_sentence": "...",
+      "next_steps_sentence": "...",
+      "bullet_points": ["...", "...", "..."]
+    },
+    "parent": { ...same keys, "audience": "parent"... },
+    "teacher": { ...same keys, "audience": "teacher"... }
+  }
+}
+
+Guidelines:
+- Include one entry in 'reports' for every listed audience, and no others.
+- Be specific: mention particular topics or skill_tags rather than generic phrases.
+- If the student performed poorly overall, be honest but encouraging.
+- Keep the tone positive and growth-oriented.
+
+STRICT OUTPUT RULES:
+- Do NOT include any text outside of the JSON.
+- Do NOT wrap the JSON in markdown or backticks.
+- The response must start with '{' and end with '}'.
+"""
+
+
+# ---------- Debrief Agent & Runner (built once per process) ----------
+
+MODEL_NAME = "gemini-2.0-flash"
+
+@cache_resource
+def get_debrief_runner() -> Runner:
+    """
+    Build the debrief_agent and its Runner once per process and reuse them.
+    """
+    debrief_agent = LlmAgent(
+        model=SharedGemini(model=MODEL_NAME),
+        name="debrief_agent",
+        description="Writes the progress summary and the audience reports for a session in one pass.",
+        instruction=DEBRIEF_INSTRUCTION,
+    )
+
+    return Runner(
+        agent=debrief_agent,
+        app_name=APP_NAME,
+        session_service=shared_session_service,  # same SessionService as the other agents
+    )
+
+
+# ---------- Public function: generate_full_debrief ----------
+
+# Fixed prompt pieces; the audience list and data JSON are filled in per call
+_DEBRIEF_PREFIX = "Summarize this student's progress, then write a report for each audience:\n"
+_DEBRIEF_DATA_HEADER = "\n\nData:\n"
+
+def generate_full_debrief(
+    profile: ProgressProfile,
+    evaluation: WorksheetEvaluation,
+    audiences: Sequence[Audience] = ("student", "parent", "teacher"),
+) -> Debrief:
+    """
+    Generate the narrative ProgressSummary and a Report for every audience with
+    a single LLM call.
+
+    This replaces a Progress Agent call followed by Report Agent call(s): the
+    profile and evaluation are sent once, and the instructions once.
+
+    `profile` must already include this session
+    (see progress_agent.update_profile_with_session).
+    """
+
+    audiences = list(audiences)
+    if not VALID_AUDIENCES.issuperset(audiences):
+        raise ValueError("audience must be one of: 'student', 'parent', 'teacher'")
+
+    payload = {
+        "audiences": audiences,
+        "progress_profile": profile_for_prompt(profile),
+        "worksheet_evaluation": evaluation.model_dump(),
+    }
+
+    # Audiences as a numbered list, the data as one compact JSON object
+    audience_list = "\n".join(f"{i}. {a}" for i, a in enumerate(audiences, start=1))
+    content = user_message(
+        _DEBRIEF_PREFIX,
+        audience_list,
+        _DEBRIEF_DATA_HEADER,
+        dumps_compact(
+            {
+                "progress_profile": payload["progress_profile"],
+                "worksheet_evaluation": payload["worksheet_evaluation"],
+            }
+        ),
+    )
+
+    response_text = run_to_final_text(get_debrief_runner(), content)
+
+    if not response_text:
+        raise RuntimeError("Debrief agent did not return a final response.")
+
+    debrief = Debrief.model_validate(extract_json_from_text(response_text))
+
+    missing = [a for a in audiences if a not in debrief.reports]
+    if missing:
+        raise RuntimeError(f"Debrief agent did not return reports for: {missing}")
+
+    debrief.reports = {a: debrief.reports[a] for a in audiences}
+    return debrief
@@ -0,0 +1,267 @@
+# study_agents/eval_explain_agent.py
+
+import asyncio
+import os
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+
+from study_agents._common import (
+    APP_NAME,
+    SharedGemini,
+    cache_resource,
+    session_service as shared_session_service,
+    arun_to_final_text,
+    dumps_compact,
+    user_message,
+)
+from study_agents.worksheet_loop import WorksheetResult
+from study_agents.evaluator_agent import (
+    QuestionEvaluation,
+    EvaluationSummary,
+    WorksheetEvaluation,
+)
+from study_agents.explanation_agent import QuestionExplanation, ExplanationSet
+
+
+# ---------- Combined Evaluation + Explanation Model ----------
+
+class EvalExplainBundle(BaseModel):
+    evaluation: WorksheetEvaluation = Field(
+        description="Per-question scores and the overall summary."
+    )
+    explanations: ExplanationSet = Field(
+        description="Hints and step-by-step explanations for every question."
+    )
+
+
+class _EvalExplainOutput(BaseModel):
+    # Flat shape the agent actually returns (used as its JSON-mode output schema)
+    evaluations: List[QuestionEvaluation]
+    summary: EvaluationSummary
+    explanations: List[QuestionExplanation]
+
+
+# ---------- Eval + Explain Agent Instruction ----------
+
+EVAL_EXPLAIN_INSTRUCTION = """
+You are an evaluation and explanation agent for a Maths practice worksheet.
+
+You are given a worksheet_result object with:
+- questions: each question has
+  - id
+  - q_type: "mcq" or "short"
+  - question_text
+  - options (for MCQ)
+  - correct_option (for MCQ, the correct option text or index)
+  - answer (for short questions: the correct answer)
+  - difficulty
+  - skill_tag
+- answers: each answer has
+  - question_id
+  - q_type
+  - student_answer (the student's response, e.g. "1", "3/4", "I don't know")
+
+You may also be given pre_graded_questions: questions that were already scored
+automatically (usually the multiple-choice ones). They are NOT part of
+worksheet_result; each has question_id, question_text, options, student_answer
+(for MCQ usually the 1-based option number), correct_answer and mistake_type.
+- Do NOT evaluate those questions again and do NOT include them in 'evaluations'.
+- DO still write explanations for them, using their mistake_type.
+
+Your tasks, in order:
+
+PART A – Evaluate every question in worksheet_result.
+1. Compare the student's answer to the correct answer.
+2. Decide a score:
+   - For MCQ:
+     - 1.0 if the student clearly chose the correct option.
+     - 0.0 if the answer is clearly incorrect or blank.
+   - For short-answer questions:
+     - 1.0 if the answer is fully correct.
+     - 0.5 if the answer is partially correct (e.g. correct idea, but small arithmetic or formatting mistake).
+     - 0.0 if the answer is incorrect.
+3. Set mistake_type:
+   - "correct" if the answer is fully correct.
+   - "minor-error" for small arithmetic or notation errors.
+   - "calculation-error" for mistakes mainly in computation.
+   - "conceptual-error" if the student does not understand the concept.
+   - "guess" if the answer looks random or unrelated.
+   - "blank" if the student left it empty or wrote "I don't know".
+   - "other" if none of the above fits.
+4. Provide short, student-friendly feedback explaining why the answer is correct or what went wrong.
+
+PART B – Explain every question, using your own evaluation from PART A.
+- Create a short_hint:
+  - 1–2 sentences.
+  - Do NOT reveal the full answer.
+  - Focus on the next best step the student should think about.
+- Create a full step-by-step explanation:
+  - Explain how to solve the question from start to finish.
+  - Use clear, age-appropriate language for the given grade.
+  - Emphasize any concept the student got wrong, based on mistake_type and feedback.
+  - If the answer was correct, still provide a brief explanation reinforcing the method.
+
+You must output ONLY a JSON object with the following structure:
+
+{
+  "evaluations": [
+    {
+      "question_id": 1,
+      "q_type": "mcq",
+      "student_answer": "...",
+      "correct_answer": "...",
+      "score": 1.0,
+      "max_score": 1.0,
+      "mistake_type": "correct",
+      "feedback": "..."
+    },
+    ...
+  ],
+  "summary": {
+    "total_questions": 10,
+    "total_score": 8.5,
+    "max_score": 10.0,
+    "percentage": 85.0
+  },
+  "explanations": [
+    {
+      "question_id": 1,
+      "short_hint": "...",
+      "explanation": "..."
+    },
+    ...
+  ]
+}
+
+Rules:
+- Provide one entry in 'explanations' for every question, including every pre-graded one.
+- Provide one entry in 'evaluations' for every question in worksheet_result.
+- The summary covers only the questions you evaluated.
+- max_score is normally 1.0 for each question.
+- total_score is the sum of all per-question scores.
+- percentage = (total_score / max_score) * 100, rounded reasonably.
+- Be consistent with the student's answers and the correct answers provided.
+- Use friendly, concise language in feedback, hints and explanations.
+
+STRICT OUTPUT RULES:
+- Do NOT include any text outside of the JSON.
+- Do NOT wrap the JSON in markdown or backticks.
+- The response must start with '{' and end with '}'.
+"""
+
+
+# ---------- Eval + Explain Agent & Runner (built once per process) ----------
+
+# Structured scoring / hints do not need the full flash tier; override via env if needed
+MODEL_NAME = os.environ.get("EVAL_EXPLAIN_MODEL", "gemini-2.0-flash-lite")
+
+@cache_resource
+def get_eval_explain_runner() -> Runner:
+    """
+    Build the eval_explain_agent and its Runner once per process and reuse them.
+    """
+    eval_explain_agent = LlmAgent(
+        model=SharedGemini(model=MODEL_NAME),
+        name="eval_explain_agent",
+        description="Scores a worksheet and writes hints and explanations for every question in one pass.",
+        instruction=EVAL_EXPLAIN_INSTRUCTION,
+        # Gemini JSON mode: the response is guaranteed to be JSON matching this schema
+        output_schema=_EvalExplainOutput,
+    )
+
+    return Runner(
+        agent=eval_explain_agent,
+        app_name=APP_NAME,
+        session_service=shared_session_service,  # same SessionService as the other agents
+    )
+
+
+# ---------- Public functions: aevaluate_and_explain / evaluate_and_explain ----------
+
+# Fixed prompt prefix; the worksheet JSON is appended per call
+_EVAL_EXPLAIN_PREFIX = "Evaluate this worksheet, then write hints and step-by-step explanations for it:\n"
+
+async def aevaluate_and_explain(
+    result: WorksheetResult,
+    result_json: Optional[str] = None,
+    pre_graded: Optional[List[QuestionEvaluation]] = None,
+) -> EvalExplainBundle:
+    """
+    Call the eval_explain_agent once to both evaluate a completed worksheet and
+    generate hints + explanations for it.
+
+    This replaces a separate Evaluator call followed by an Explanation call:
+    the worksheet is sent to Gemini once instead of twice.
+
+    Pass `result_json` (result.model_dump_json()) if the caller already has it,
+    to avoid serializing the worksheet again.
+
+    Questions already scored by the caller can be passed as `pre_graded`. Only the
+    other questions (and their answers) are then sent as the worksheet to evaluate
+    (`result_json` is not used); the pre-graded ones go along in a compact form so
+    they are still explained. The returned evaluation covers just the other
+    questions (merging the two is up to the caller).
+    """
+
+    if pre_graded:
+        graded_by_qid = {ev.question_id: ev for ev in pre_graded}
+        to_grade = WorksheetResult(
+            questions=[q for q in result.questions if q.id not in graded_by_qid],
+            answers=[a for a in result.answers if a.question_id not in graded_by_qid],
+        )
+        # Just what an explanation needs; the evaluation fields come from the local grading
+        pre_graded_questions = [
+            {
+                "question_id": q.id,
+                "question_text": q.question_text,
+                "options": q.options,
+                "student_answer": ev.student_answer,
+                "correct_answer": ev.correct_answer,
+                "mistake_type": ev.mistake_type,
+            }
+            for q in result.questions
+            if (ev := graded_by_qid.get(q.id)) is not None
+        ]
+        payload_json = (
+            '{"worksheet_result": ' + to_grade.model_dump_json()
+            + ', "pre_graded_questions": ' + dumps_compact(pre_graded_questions)
+            + "}"
+        )
+    else:
+        # Compact JSON straight from pydantic-core, as in the evaluator agent
+        payload_json = result_json if result_json is not None else result.model_dump_json()
+        payload_json = '{"worksheet_result": ' + payload_json + "}"
+
+    content = user_message(_EVAL_EXPLAIN_PREFIX, payload_json)
+
+    response_text = await arun_to_final_text(get_eval_explain_runner(), content)
+
+    if not response_text:
+        raise RuntimeError("Eval + explain agent did not return a final response.")
+
+    # JSON mode output can be validated directly, no brace/fence extraction needed
+    output = _EvalExplainOutput.model_validate_json(response_text)
+
+    evaluation = WorksheetEvaluation(
+        evaluations=output.evaluations,
+        summary=output.summary,
+    )
+    explanations = ExplanationSet(explanations=output.explanations)
+    return EvalExplainBundle(evaluation=evaluation, explanations=explanations)
+
+
+def evaluate_and_explain(
+    result: WorksheetResult,
+    result_json: Optional[str] = None,
+    pre_graded: Optional[List[QuestionEvaluation]] = None,
+) -> EvalExplainBundle:
+    """
+    Synchronous wrapper around aevaluate_and_explain (for scripts and non-async callers).
+    """
+    return asyncio.run(
+        aevaluate_and_explain(result, result_json=result_json, pre_graded=pre_graded)
+    )
@@ -1,20 +1,21 @@
 # study_agents/evaluator_agent.py
 
-import json
-from typing import List, Literal
+import asyncio
+import os
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
-from google.genai import types
 
-from study_agents.planner_agent import (
+from study_agents._common import (
     APP_NAME,
-    USER_ID,
-    SESSION_ID,
-    extract_json_from_text,
+    SharedGemini,
+    cache_resource,
     session_service as shared_session_service,
+    arun_to_final_text,
+    user_message,
 )
 from study_agents.worksheet_loop import WorksheetResult
 from study_agents.question_generator_agent import Question
@@ -144,61 +145,76 @@ STRICT OUTPUT RULES:
 """
 
 
-# ---------- Create Evaluator Agent & Runner ----------
+# ---------- Evaluator Agent & Runner (built once per process) ----------
 
-MODEL_NAME = "gemini-2.0-flash"
+# Structured scoring / hints do not need the full flash tier; override via env if needed
+MODEL_NAME = os.environ.get("EVAL_MODEL", "gemini-2.0-flash-lite")
 
-evaluator_agent = LlmAgent(
-    model=MODEL_NAME,
-    name="evaluator_agent",
-    description="Evaluates student answers against correct answers and provides scores and feedback.",
-    instruction=EVALUATOR_INSTRUCTION,
-)
+@cache_resource
+def get_evaluator_runner() -> Runner:
+    """
+    Build the evaluator_agent and its Runner once per process and reuse them.
+    """
+    evaluator_agent = LlmAgent(
+        model=SharedGemini(model=MODEL_NAME),
+        name="evaluator_agent",
+        description="Evaluates student answers against correct answers and provides scores and feedback.",
+        instruction=EVALUATOR_INSTRUCTION,
+        # Gemini JSON mode: the response is guaranteed to be JSON matching this schema
+        output_schema=WorksheetEvaluation,
+    )
 
-e_runner = Runner(
-    agent=evaluator_agent,
-    app_name=APP_NAME,
-    session_service=shared_session_service,  # same SessionService as Planner & QGen
-)
+    return Runner(
+        agent=evaluator_agent,
+        app_name=APP_NAME,
+        session_service=shared_session_service,  # same SessionService as Planner & QGen
+    )
 
 
-# ---------- Public function: evaluate_worksheet ----------
+# ---------- Public functions: aevaluate_worksheet / evaluate_worksheet ----------
+
+# Fixed prompt pieces; the worksheet JSON goes between them
+_EVAL_PREFIX = (
+    "Evaluate this worksheet: assign scores and feedback per question, and a summary.\n"
+    '{"worksheet_result": '
+)
+_EVAL_SUFFIX = "}"
 
-def evaluate_worksheet(result: WorksheetResult) -> WorksheetEvaluation:
+async def aevaluate_worksheet(
+    result: WorksheetResult,
+    result_json: Optional[str] = None,
+) -> WorksheetEvaluation:
     """
     Call the evaluator_agent to evaluate a completed worksheet (questions + answers).
     Returns a WorksheetEvaluation with per-question scores and an overall summary.
-    """
 
-    payload = {
-        "worksheet_result": result.model_dump(),
-    }
+    Pass `result_json` (result.model_dump_json()) if the caller already has it,
+    to avoid serializing the worksheet again.
 
-    prompt = (
-        "Evaluate this worksheet: assign scores and feedback per question, and a summary.\n"
-        + json.dumps(payload, indent=2)
-    )
+    Uses the async ADK runner so the event loop stays free while waiting on Gemini.
+    """
 
-    content = types.Content(
-        role="user",
-        parts=[types.Part(text=prompt)],
-    )
+    # Serialize straight to compact JSON with pydantic-core (no dict intermediate,
+    # no pretty-print whitespace tokens in the prompt)
+    payload_json = result_json if result_json is not None else result.model_dump_json()
 
-    response_text = None
+    content = user_message(_EVAL_PREFIX, payload_json, _EVAL_SUFFIX)
 
-    for event in e_runner.run(
-        user_id=USER_ID,
-        session_id=SESSION_ID,
-        new_message=content,
-    ):
-        # Uncomment to debug:
-        # print("EVALUATOR EVENT:", event)
-        if event.is_final_response() and event.content and event.content.parts:
-            response_text = event.content.parts[0].text.strip()
+    response_text = await arun_to_final_text(get_evaluator_runner(), content)
 
     if not response_text:
         raise RuntimeError("Evaluator agent did not return a final response.")
 
-    eval_dict = extract_json_from_text(response_text)
-    evaluation = WorksheetEvaluation.model_validate(eval_dict)
-    return evaluation
\ No newline at end of file
+    # JSON mode output can be validated directly, no brace/fence extraction needed
+    evaluation = WorksheetEvaluation.model_validate_json(response_text)
+    return evaluation
+
+
+def evaluate_worksheet(
+    result: WorksheetResult,
+    result_json: Optional[str] = None,
+) -> WorksheetEvaluation:
+    """
+    Synchronous wrapper around aevaluate_worksheet (for scripts and non-async callers).
+    """
+    return asyncio.run(aevaluate_worksheet(result, result_json=result_json))
@@ -1,20 +1,22 @@
 # study_agents/explanation_agent.py
 
-import json
-from typing import List
+import asyncio
+import os
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
-from google.genai import types
 
-from study_agents.planner_agent import (
+from study_agents._common import (
     APP_NAME,
-    USER_ID,
-    SESSION_ID,
+    SharedGemini,
     extract_json_from_text,
+    cache_resource,
     session_service as shared_session_service,
+    arun_to_final_text,
+    user_message,
 )
 from study_agents.worksheet_loop import WorksheetResult
 from study_agents.evaluator_agent import WorksheetEvaluation
@@ -107,66 +109,92 @@ STRICT OUTPUT RULES:
 """
 
 
-# ---------- Create Explanation Agent & Runner ----------
+# ---------- Explanation Agent & Runner (built once per process) ----------
 
-MODEL_NAME = "gemini-2.0-flash"
+# Structured scoring / hints do not need the full flash tier; override via env if needed
+MODEL_NAME = os.environ.get("EXPLAIN_MODEL", "gemini-2.0-flash-lite")
 
-explanation_agent = LlmAgent(
-    model=MODEL_NAME,
-    name="explanation_agent",
-    description="Provides hints and step-by-step explanations for each worksheet question.",
-    instruction=EXPLANATION_INSTRUCTION,
-)
+@cache_resource
+def get_explanation_runner() -> Runner:
+    """
+    Build the explanation_agent and its Runner once per process and reuse them.
+    """
+    explanation_agent = LlmAgent(
+        model=SharedGemini(model=MODEL_NAME),
+        name="explanation_agent",
+        description="Provides hints and step-by-step explanations for each worksheet question.",
+        instruction=EXPLANATION_INSTRUCTION,
+    )
 
-x_runner = Runner(
-    agent=explanation_agent,
-    app_name=APP_NAME,
-    session_service=shared_session_service,  # same SessionService as created in planner agent
-)
+    return Runner(
+        agent=explanation_agent,
+        app_name=APP_NAME,
+        session_service=shared_session_service,  # same SessionService as the other agents
+    )
 
 
-# ---------- Public function: generate_explanations ----------
+# ---------- Public functions: agenerate_explanations / generate_explanations ----------
 
-def generate_explanations(
+# Fixed prompt pieces; the worksheet and evaluation JSON go between them
+_EXPLAIN_PREFIX = (
+    "Generate hints and step-by-step explanations for this worksheet:\n"
+    '{"worksheet_result": '
+)
+_EXPLAIN_EVALUATION_KEY = ', "worksheet_evaluation": '
+_EXPLAIN_SUFFIX = "}"
+
+async def agenerate_explanations(
     result: WorksheetResult,
     evaluation: WorksheetEvaluation,
+    result_json: Optional[str] = None,
+    evaluation_json: Optional[str] = None,
 ) -> ExplanationSet:
     """
     Call the explanation_agent to generate hints + step-by-step explanations
     for each question in the worksheet, based on both the student's answers
     and the evaluation.
-    """
 
-    payload = {
-        "worksheet_result": result.model_dump(),
-        "worksheet_evaluation": evaluation.model_dump(),
-    }
+    Uses the async ADK runner so the event loop stays free while waiting on Gemini.
 
-    prompt = (
-        "Generate hints and step-by-step explanations for this worksheet:\n"
-        + json.dumps(payload, indent=2)
-    )
+    Pass `result_json` / `evaluation_json` (their model_dump_json()) if the caller
+    already has them, to avoid serializing the same objects again.
+    """
 
-    content = types.Content(
-        role="user",
-        parts=[types.Part(text=prompt)],
-    )
+    # Serialize straight to compact JSON with pydantic-core (no dict intermediate,
+    # no pretty-print whitespace tokens in the prompt)
+    if result_json is None:
+        result_json = result.model_dump_json()
+    if evaluation_json is None:
+        evaluation_json = evaluation.model_dump_json()
 
-    response_text = None
+    content = user_message(
+        _EXPLAIN_PREFIX, result_json, _EXPLAIN_EVALUATION_KEY, evaluation_json, _EXPLAIN_SUFFIX
+    )
 
-    for event in x_runner.run(
-        user_id=USER_ID,
-        session_id=SESSION_ID,
-        new_message=content,
-    ):
-        # Uncomment for debugging:
-        # print("EXPLANATION EVENT:", event)
-        if event.is_final_response() and event.content and event.content.parts:
-            response_text = event.content.parts[0].text.strip()
+    response_text = await arun_to_final_text(get_explanation_runner(), content)
 
     if not response_text:
         raise RuntimeError("Explanation agent did not return a final response.")
 
     expl_dict = extract_json_from_text(response_text)
     explanation_set = ExplanationSet.model_validate(expl_dict)
-    return explanation_set
\ No newline at end of file
+    return explanation_set
+
+
+def generate_explanations(
+    result: WorksheetResult,
+    evaluation: WorksheetEvaluation,
+    result_json: Optional[str] = None,
+    evaluation_json: Optional[str] = None,
+) -> ExplanationSet:
+    """
+    Synchronous wrapper around agenerate_explanations (for scripts and non-async callers).
+    """
+    return asyncio.run(
+        agenerate_explanations(
+            result,
+            evaluation,
+            result_json=result_json,
+            evaluation_json=evaluation_json,
+        )
+    )
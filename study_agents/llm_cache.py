@@ -0,0 +1,174 @@
+# study_agents/llm_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+# ---------- Settings ----------
+
+# SQLite file shared by every process on this machine; set LLM_CACHE_PATH="" to keep
+# the cache in memory only (e.g. on a read-only filesystem).
+CACHE_PATH = os.environ.get("LLM_CACHE_PATH", ".llm_cache.sqlite3")
+LRU_MAX_ENTRIES = 512
+# Entries older than this are not served and are deleted (0 = never expire)
+CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Row cap of the SQLite table; the oldest rows go first (0 = unlimited)
+CACHE_MAX_ROWS = int(os.environ.get("LLM_CACHE_MAX_ROWS", "10000"))
+# Expired / surplus rows are pruned on open and then once every this many writes
+PRUNE_EVERY = 100
+
+
+# ---------- Key helpers ----------
+
+def canonical_json(payload: Any) -> str:
+    """
+    Compact JSON with sorted keys, so equal payloads always give equal text.
+    String values are kept exactly as given: answers and topics that differ only in
+    case or spacing ("x" / "X") can need different agent output.
+    """
+    return json.dumps(
+        payload,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+
+
+def cache_key(agent_name: str, payload: Any) -> str:
+    return hashlib.sha256(
+        (agent_name + "\n" + canonical_json(payload)).encode("utf-8")
+    ).hexdigest()
+
+
+# ---------- LLMCache ----------
+
+class LLMCache:
+    """
+    Two-level cache of validated agent outputs: an in-memory LRU in front of a
+    SQLite table. Values are the `model_dump(mode="json")` dicts of the agents'
+    pydantic results, so a hit only costs a `model_validate`.
+
+    Entries expire after `ttl_seconds`, and the table keeps at most `max_rows`
+    rows (the oldest are deleted first), so the file does not grow forever.
+    """
+
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        max_entries: int = LRU_MAX_ENTRIES,
+        ttl_seconds: int = CACHE_TTL_SECONDS,
+        max_rows: int = CACHE_MAX_ROWS,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        # key -> (created_at, value)
+        self._lru: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()  # agents are called from worker threads
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        # Opened on first use, so importing an agent never touches the disk
+        if self._conn is None and self.path:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, agent TEXT NOT NULL, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(llm_cache)")}
+            if "created_at" not in columns:
+                # Table from before expiry existed: its rows count as expired
+                conn.execute("ALTER TABLE llm_cache ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_created_at ON llm_cache (created_at)")
+            self._conn = conn
+            self._prune()
+        return self._conn
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and created_at < time.time() - self.ttl_seconds
+
+    def _prune(self) -> None:
+        """Delete expired rows, then the oldest rows beyond max_rows (lock held)."""
+        db = self._conn
+        if self.ttl_seconds > 0:
+            db.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+        if self.max_rows > 0:
+            db.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,),
+            )
+        db.commit()
+
+    def _remember(self, key: str, created_at: float, value: dict) -> None:
+        self._lru[key] = (created_at, value)
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def get(self, agent_name: str, payload: Any) -> Optional[dict]:
+        """Return the cached output dict for this agent + payload, or None."""
+        key = cache_key(agent_name, payload)
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._lru.move_to_end(key)
+                    return entry[1]
+                del self._lru[key]
+
+            db = self._db()
+            if db is None:
+                return None
+            row = db.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1]):
+                return None
+            value = json.loads(row[0])
+            self._remember(key, row[1], value)
+            return value
+
+    def set(self, agent_name: str, payload: Any, value: dict) -> None:
+        """Store an agent's validated output (as a JSON-compatible dict)."""
+        key = cache_key(agent_name, payload)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            db = self._db()
+            if db is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, agent, value, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, agent_name, json.dumps(value, separators=(",", ":")), now),
+                )
+                self._writes += 1
+                if self._writes % PRUNE_EVERY == 0:
+                    self._prune()
+                else:
+                    db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            db = self._db()
+            if db is not None:
+                db.execute("DELETE FROM llm_cache")
+                db.commit()
+
+
+# One cache per process, shared by all agents
+llm_cache = LLMCache()
@@ -1,18 +1,29 @@
 # study_agents/planner_agent.py
 
 
-import re
-from typing import Dict
-import os
-import json
-from pydantic import BaseModel, Field
+import logging
+from pydantic import BaseModel, ConfigDict, Field
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
+
+from study_agents._common import (
+    APP_NAME,
+    SharedGemini,
+    dumps_compact,
+    extract_json_from_text,
+    run_to_final_text,
+    session_service,
+    user_message,
+)
+from study_agents.llm_cache import llm_cache
+
+log = logging.getLogger(__name__)
 
 # Define the structured output: StudyPlan model
 class StudyPlan(BaseModel):
+    # Not changed after parsing: frozen
+    model_config = ConfigDict(frozen=True, extra="ignore", populate_by_name=True)
+
     total_questions: int = Field(description="Total number of questions in the session.")
     mcq_count: int = Field(description="Number of multiple-choice questions.")
     short_count: int = Field(description="Number of short answer questions.")
@@ -74,67 +85,22 @@ STRICT RULES:
 MODEL_NAME = "gemini-2.0-flash"  # or the model they recommend in the course
 
 planner_agent = LlmAgent(
-    model=MODEL_NAME,
+    model=SharedGemini(model=MODEL_NAME),
     name="planner_agent",
     description="Plans the number and mix of questions for a study session.",
     instruction=PLANNER_INSTRUCTION,
     # For now we'll parse JSON manually instead of output_schema to simplify debugging
 )
 
-# Set up Session + Runner (the ADK runtime loop)
-APP_NAME = "study_companion_app"
-USER_ID = "demo_user"
-SESSION_ID = "planner_session_1"
-
-# 1) Create the session service
-session_service = InMemorySessionService()
-
-# 2) Create a session synchronously (no async, no await)
-session = session_service.create_session_sync(
-    app_name=APP_NAME,
-    user_id=USER_ID,
-    session_id=SESSION_ID,
-)
-
-# 3) Create the runner
+# Set up the Runner (the ADK runtime loop); calls run in ephemeral sessions
 runner = Runner(
     agent=planner_agent,
     app_name=APP_NAME,
     session_service=session_service,
 )
 
-# Helper function to call the Planner Agent -- Ensuring only JSON output
-def extract_json_from_text(text: str) -> dict:
-    """
-    Try to extract a JSON object from the model's text output.
-    Handles code fences and extra narration.
-    """
-    if not text:
-        raise ValueError("Model returned empty response text.")
-
-    raw = text.strip()
-
-    # If wrapped in ```...```, strip the fences first
-    if raw.startswith("```"):
-        # remove starting fence with optional language label
-        raw = re.sub(r"^```[a-zA-Z0-9_+-]*\s*", "", raw)
-        # remove trailing fence
-        if raw.endswith("```"):
-            raw = raw[:-3].strip()
-
-    # Find the first '{' and the last '}' to isolate the JSON object
-    start = raw.find("{")
-    end = raw.rfind("}")
-
-    if start == -1 or end == -1 or end <= start:
-        print("Could not locate JSON braces in output. Full text was:\n")
-        print(raw)
-        raise ValueError("Could not find JSON object in LLM output.")
-
-    json_str = raw[start : end + 1]
-
-    # Now try to load it
-    return json.loads(json_str)
+# Fixed prompt prefix; the payload JSON is appended per call
+_PLANNER_PREFIX = "Create a study question plan using the provided input:\n"
 
 # Method to query LLM and get output
 def get_study_plan(
@@ -144,7 +110,7 @@ def get_study_plan(
     time_minutes: int,
     difficulty: str,
 ):
-    print("=== PLANNER AGENT ===")
+    log.debug("planner_agent: %s / %s / %s", grade, subject, topic)
     user_payload = {
         "grade": grade,
         "subject": subject,
@@ -153,22 +119,14 @@ def get_study_plan(
         "difficulty": difficulty,
     }
 
-    prompt = (
-        "Create a study question plan using the provided input:\n"
-        + json.dumps(user_payload, indent=2)
-    )
-
-    content = types.Content(role="user", parts=[types.Part(text=prompt)])
+    # Same inputs -> same plan: skip the LLM call on a cache hit
+    cached = llm_cache.get("planner_agent", user_payload)
+    if cached is not None:
+        return StudyPlan.model_validate(cached)
 
-    response_text = None
+    content = user_message(_PLANNER_PREFIX, dumps_compact(user_payload))
 
-    for event in runner.run(
-        user_id=USER_ID,
-        session_id=SESSION_ID,
-        new_message=content,
-    ):
-        if event.is_final_response() and event.content and event.content.parts:
-            response_text = event.content.parts[0].text.strip()
+    response_text = run_to_final_text(runner, content)
 
     if not response_text:
         raise RuntimeError("Planner agent did not return a final response text.")
@@ -176,10 +134,10 @@ def get_study_plan(
     # Use the robust extractor here
     try:
         plan_dict = extract_json_from_text(response_text)
-    except Exception as e:
-        print("Raw response_text from planner_agent:\n")
-        print(response_text)
-        raise e
+    except Exception:
+        log.warning("Raw response_text from planner_agent:\n%s", response_text)
+        raise
 
     plan = StudyPlan.model_validate(plan_dict)
+    llm_cache.set("planner_agent", user_payload, plan.model_dump(mode="json"))
     return plan
\ No newline at end of file
@@ -1,34 +1,42 @@
 # study_agents/progress_agent.py
 
-import json
+import asyncio
+import os
 from typing import Dict, List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
-from google.genai import types
 
-from study_agents.planner_agent import (
+from study_agents._common import (
     APP_NAME,
-    USER_ID,
-    SESSION_ID,
+    SharedGemini,
     extract_json_from_text,
+    dumps_compact,
+    estimate_tokens,
+    user_message,
     session_service as shared_session_service,
+    arun_to_final_text,
 )
 from study_agents.worksheet_loop import WorksheetResult
 from study_agents.evaluator_agent import WorksheetEvaluation
+from study_agents.progress_store import ProgressStore
 
 
 # ---------- Progress Profile Models (numeric long-term memory) ----------
 
 class SkillStat(BaseModel):
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+
     attempts: int = Field(default=0, description="How many times this skill has been practiced.")
     correct: int = Field(default=0, description="How many times the student was correct.")
     accuracy: float = Field(default=0.0, description="Correct / attempts * 100.")
 
 
 class TopicProgress(BaseModel):
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+
     skills: Dict[str, SkillStat] = Field(
         default_factory=dict,
         description="Mapping from skill_tag to SkillStat.",
@@ -36,6 +44,8 @@ class TopicProgress(BaseModel):
 
 
 class ProgressProfile(BaseModel):
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+
     student_id: str = Field(description="Unique ID for the student.")
     grade: str = Field(description="Student's grade (e.g. 'Year 5').")
     subject: str = Field(description="Subject (e.g. 'Maths').")
@@ -51,6 +61,9 @@ class ProgressProfile(BaseModel):
 # ---------- Narrative Progress Summary Model (LLM output) ----------
 
 class ProgressSummary(BaseModel):
+    # Not changed after parsing: frozen
+    model_config = ConfigDict(frozen=True, extra="ignore", populate_by_name=True)
+
     summary_text: str = Field(
         description="A short narrative summary of the student's recent performance and progress."
     )
@@ -71,19 +84,60 @@ class ProgressSummary(BaseModel):
     )
 
 
-# ---------- In-memory "DB" for long-term progress ----------
+# ---------- Prompt budget for the profile ----------
 
-# Simple in-memory store: student_id -> ProgressProfile
-PROGRESS_DB: Dict[str, ProgressProfile] = {}
+# Upper bound (estimated tokens) for the profile part of a prompt. Profiles grow with
+# every new topic; past this, the least-practiced topics are left out of the prompt.
+PROFILE_TOKEN_BUDGET = int(os.environ.get("PROFILE_TOKEN_BUDGET", "6000"))
+
+
+def profile_for_prompt(
+    profile: ProgressProfile,
+    token_budget: int = PROFILE_TOKEN_BUDGET,
+) -> dict:
+    """
+    Return profile.model_dump() for use in a prompt, dropping the least-practiced
+    topics if the profile would take more than `token_budget` tokens.
+    The most recent topic (last_topic) is always kept. The stored profile is not changed.
+    """
+    profile_dict = profile.model_dump()
+    if estimate_tokens(profile.model_dump_json()) <= token_budget:
+        return profile_dict
+
+    topics = profile_dict["topics"]
+
+    def rank(name: str) -> tuple:
+        attempts = sum(stat["attempts"] for stat in topics[name]["skills"].values())
+        return (name == profile.last_topic, attempts)
+
+    used = estimate_tokens(dumps_compact({**profile_dict, "topics": {}}))
+    kept = {}
+    for name in sorted(topics, key=rank, reverse=True):
+        cost = estimate_tokens(dumps_compact({name: topics[name]}))
+        if kept and used + cost > token_budget:
+            continue
+        kept[name] = topics[name]
+        used += cost
+
+    profile_dict["topics"] = kept
+    return profile_dict
+
+
+# ---------- SQLite "DB" for long-term progress ----------
+
+# Durable store: student_id -> ProgressProfile (SQLite file + in-process LRU)
+PROGRESS_DB_PATH = os.environ.get("PROGRESS_DB_PATH", "progress.db")
+PROGRESS_DB: ProgressStore[ProgressProfile] = ProgressStore(PROGRESS_DB_PATH, ProgressProfile)
 
 
 def load_progress_profile(student_id: str, grade: str, subject: str) -> ProgressProfile:
     """
-    Load a student's progress profile from the in-memory DB.
+    Load a student's progress profile from the progress DB.
     If none exists, create a new default profile.
     """
-    if student_id in PROGRESS_DB:
-        return PROGRESS_DB[student_id]
+    profile = PROGRESS_DB.get(student_id)
+    if profile is not None:
+        return profile
 
     profile = ProgressProfile(
         student_id=student_id,
@@ -94,15 +148,15 @@ def load_progress_profile(student_id: str, grade: str, subject: str) -> Progress
         last_topic="",
         last_percentage=0.0,
     )
-    PROGRESS_DB[student_id] = profile
+    PROGRESS_DB.put(student_id, profile)
     return profile
 
 
 def save_progress_profile(profile: ProgressProfile) -> None:
     """
-    Save/update the profile in the in-memory DB.
+    Save/update the profile in the progress DB.
     """
-    PROGRESS_DB[profile.student_id] = profile
+    PROGRESS_DB.put(profile.student_id, profile)
 
 
 def update_profile_with_session(
@@ -119,38 +173,41 @@ def update_profile_with_session(
     """
 
     # Ensure topic exists
-    if topic not in profile.topics:
-        profile.topics[topic] = TopicProgress(skills={})
-
-    topic_progress = profile.topics[topic]
-
-    # Build a quick lookup for evaluation by question_id
-    eval_by_qid = {ev.question_id: ev for ev in evaluation.evaluations}
-
-    for q in result.questions:
-        ev = eval_by_qid.get(q.id)
-        if not ev:
+    topic_progress = profile.topics.get(topic)
+    if topic_progress is None:
+        topic_progress = profile.topics[topic] = TopicProgress(skills={})
+
+    # Tally this session per skill in one pass over the evaluations:
+    # skill_tag -> [attempts, correct]
+    questions_by_id = result.questions_by_id
+    tally: Dict[str, List[int]] = {}
+
+    for ev in evaluation.evaluations:
+        question = questions_by_id.get(ev.question_id)
+        if question is None:
             continue
+        skill_tag = question.skill_tag or "unknown-skill"
 
-        skill_tag = q.skill_tag or "unknown-skill"
-
-        if skill_tag not in topic_progress.skills:
-            topic_progress.skills[skill_tag] = SkillStat(attempts=0, correct=0, accuracy=0.0)
-
-        stat = topic_progress.skills[skill_tag]
-
-        stat.attempts += 1
+        counts = tally.get(skill_tag)
+        if counts is None:
+            counts = tally[skill_tag] = [0, 0]
+        counts[0] += 1
         # Consider >= 0.99 as fully correct
         if ev.score >= 0.99:
-            stat.correct += 1
+            counts[1] += 1
 
-        # Recompute accuracy
-        if stat.attempts > 0:
-            stat.accuracy = round((stat.correct / stat.attempts) * 100.0, 2)
+    # Fold the tally into the stored stats (mutated in place) and recompute
+    # accuracy once per skill
+    skills = topic_progress.skills
+    for skill_tag, (attempts, correct) in tally.items():
+        stat = skills.get(skill_tag)
+        if stat is None:
+            stat = skills[skill_tag] = SkillStat(attempts=0, correct=0, accuracy=0.0)
 
-        topic_progress.skills[skill_tag] = stat
+        stat.attempts += attempts
+        stat.correct += correct
+        stat.accuracy = round((stat.correct / stat.attempts) * 100.0, 2)
 
-    profile.topics[topic] = topic_progress
     profile.total_sessions += 1
     profile.last_topic = topic
     profile.last_percentage = evaluation.summary.percentage
@@ -224,7 +281,7 @@ STRICT OUTPUT RULES:
 MODEL_NAME = "gemini-2.0-flash"
 
 progress_agent = LlmAgent(
-    model=MODEL_NAME,
+    model=SharedGemini(model=MODEL_NAME),
     name="progress_agent",
     description="Analyzes numeric progress profile and latest evaluation to produce a narrative progress summary.",
     instruction=PROGRESS_INSTRUCTION,
@@ -237,9 +294,12 @@ p_runner = Runner(
 )
 
 
-# ---------- Public function: generate_progress_summary ----------
+# ---------- Public functions: agenerate_progress_summary / generate_progress_summary ----------
 
-def generate_progress_summary(
+# Fixed prompt prefix; the payload JSON is appended per call
+_PROGRESS_PREFIX = "Analyze this student's progress and generate a short summary and recommendations:\n"
+
+async def agenerate_progress_summary(
     student_id: str,
     grade: str,
     subject: str,
@@ -251,6 +311,9 @@ def generate_progress_summary(
     Update the numeric progress profile based on this session and then
     call the progress_agent to generate a narrative ProgressSummary.
 
+    Uses the async ADK runner, so it can be awaited alongside other agents that
+    only need the evaluation (e.g. explanation_agent.agenerate_explanations).
+
     Returns:
         (profile, progress_summary)
     """
@@ -263,35 +326,33 @@ def generate_progress_summary(
 
     # 3) Prepare payload for LLM
     payload = {
-        "progress_profile": profile.model_dump(),
+        "progress_profile": profile_for_prompt(profile),
         "worksheet_evaluation": evaluation.model_dump(),
     }
 
-    prompt = (
-        "Analyze this student's progress and generate a short summary and recommendations:\n"
-        + json.dumps(payload, indent=2)
-    )
+    content = user_message(_PROGRESS_PREFIX, dumps_compact(payload))
 
-    content = types.Content(
-        role="user",
-        parts=[types.Part(text=prompt)],
-    )
-
-    response_text = None
-
-    for event in p_runner.run(
-        user_id=USER_ID,
-        session_id=SESSION_ID,
-        new_message=content,
-    ):
-        # Uncomment for debugging:
-        # print("PROGRESS EVENT:", event)
-        if event.is_final_response() and event.content and event.content.parts:
-            response_text = event.content.parts[0].text.strip()
+    response_text = await arun_to_final_text(p_runner, content)
 
     if not response_text:
         raise RuntimeError("Progress agent did not return a final response.")
 
     summary_dict = extract_json_from_text(response_text)
     progress_summary = ProgressSummary.model_validate(summary_dict)
-    return profile, progress_summary
\ No newline at end of file
+    return profile, progress_summary
+
+
+def generate_progress_summary(
+    student_id: str,
+    grade: str,
+    subject: str,
+    topic: str,
+    result: WorksheetResult,
+    evaluation: WorksheetEvaluation,
+) -> tuple[ProgressProfile, ProgressSummary]:
+    """
+    Synchronous wrapper around agenerate_progress_summary (for scripts and non-async callers).
+    """
+    return asyncio.run(
+        agenerate_progress_summary(student_id, grade, subject, topic, result, evaluation)
+    )
\ No newline at end of file
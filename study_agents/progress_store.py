@@ -0,0 +1,83 @@
+# study_agents/progress_store.py
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Generic, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+
+M = TypeVar("M", bound=BaseModel)
+
+
+# ---------- ProgressStore ----------
+
+class ProgressStore(Generic[M]):
+    """
+    Durable key -> pydantic model store (used for student progress profiles).
+
+    Rows live in SQLite (WAL mode) as the model's JSON, one row per key, so a
+    lookup reads and parses only that student's profile. Recently used models
+    are also kept in an in-process LRU, so hot reads skip SQLite entirely.
+    """
+
+    def __init__(self, path: str, model_cls: Type[M], max_cached: int = 256):
+        self.path = path
+        self.model_cls = model_cls
+        self.max_cached = max_cached
+        self._lru: "OrderedDict[str, M]" = OrderedDict()
+        self._lock = threading.Lock()  # analyses run in worker threads
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        # Opened on first use, so importing the progress agent never touches the disk
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                "student_id TEXT PRIMARY KEY, blob BLOB NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, obj: M) -> None:
+        self._lru[key] = obj
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.max_cached:
+            self._lru.popitem(last=False)
+
+    def get(self, key: str) -> Optional[M]:
+        """
+        Return a copy of the stored model for `key`, or None if there is none.
+        Callers may mutate the copy (update_profile_with_session does) without
+        touching the cached object other threads read.
+        """
+        with self._lock:
+            obj = self._lru.get(key)
+            if obj is not None:
+                self._lru.move_to_end(key)
+                return obj.model_copy(deep=True)
+
+            row = self._db().execute(
+                "SELECT blob FROM profiles WHERE student_id = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            obj = self.model_cls.model_validate_json(row[0])
+            self._remember(key, obj)
+            return obj.model_copy(deep=True)
+
+    def put(self, key: str, obj: M) -> None:
+        """Insert or replace the model stored for `key` (a copy is cached)."""
+        with self._lock:
+            self._remember(key, obj.model_copy(deep=True))
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO profiles (student_id, blob) VALUES (?, ?)",
+                (key, obj.model_dump_json().encode()),
+            )
+            db.commit()
@@ -1,10 +1,10 @@
 # study_agents/question_generator_agent.py
 
-import json
+import logging
 import re
 from typing import List, Optional, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
@@ -14,17 +14,25 @@ from typing import List, Optional, Literal
 from pydantic import BaseModel, Field
 # from study_agents.planner_agent import StudyPlan, extract_json_from_text
 
-from study_agents.planner_agent import (
-    StudyPlan,
-    extract_json_from_text,
+from study_agents.planner_agent import StudyPlan
+from study_agents._common import (
+    extract_json_text,
+    dumps_compact,
+    user_message,
     APP_NAME,
-    USER_ID,
-    SESSION_ID,
-    session_service as planner_session_service,
+    SharedGemini,
+    session_service as shared_session_service,
+    run_to_final_text,
 )
+from study_agents.llm_cache import llm_cache
+
+log = logging.getLogger(__name__)
 
 #Step 1 – Define Question Models (Pydantic)
 class Question(BaseModel):
+    # Not changed after parsing: frozen
+    model_config = ConfigDict(frozen=True, extra="ignore", populate_by_name=True)
+
     id: int = Field(description="Question index in the worksheet (starting from 1).")
     q_type: Literal["mcq", "short"] = Field(
         description="Type of the question: 'mcq' for multiple-choice, 'short' for short answer."
@@ -55,6 +63,8 @@ class Question(BaseModel):
     )
 
 class QuestionSet(BaseModel):
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+
     questions: List[Question] = Field(
         description="List of all questions generated for this session."
     )
@@ -145,21 +155,42 @@ MODEL_NAME = "gemini-2.0-flash"
 # ---------- Create Question Generator Agent & Runner ----------
 
 question_generator_agent = LlmAgent(
-    model=MODEL_NAME,
+    model=SharedGemini(model=MODEL_NAME),
     name="question_generator_agent",
     description="Generates MCQ and short-answer questions based on a study plan.",
     instruction=QUESTION_GENERATOR_INSTRUCTION,
     # We'll parse JSON manually (like with planner) for now
 )
 
-# We do not need to create a new session; we can reuse SESSION_ID that already exists.
-# Both agents share the same underlying InMemorySessionService.
+# All agents share the same underlying InMemorySessionService.
 q_runner = Runner(
     agent=question_generator_agent,
     app_name=APP_NAME,
-    session_service=planner_session_service,
+    session_service=shared_session_service,
 )
 
+# ---------- Helpers: request payload / prompt ----------
+
+# Fixed prompt prefix; the payload JSON is appended per call
+_QUESTIONS_PREFIX = "Generate questions for the following student session:\n"
+
+
+def _question_payload(plan: StudyPlan, grade: str, subject: str, topic: str) -> dict:
+    # Convert StudyPlan to pure dict for JSON
+    plan_dict = plan.model_dump()
+
+    return {
+        "grade": grade,
+        "subject": subject,
+        "topic": topic,
+        "study_plan": plan_dict,
+    }
+
+
+def _question_content(user_payload: dict) -> types.Content:
+    return user_message(_QUESTIONS_PREFIX, dumps_compact(user_payload))
+
+
 # ---------- Public function: generate_questions ----------
 
 def generate_questions(
@@ -172,45 +203,25 @@ def generate_questions(
     Calls the question_generator_agent to create a list of questions based on the StudyPlan.
     Returns a QuestionSet object.
     """
-    # Convert StudyPlan to pure dict for JSON
-    plan_dict = plan.model_dump()
+    user_payload = _question_payload(plan, grade, subject, topic)
 
-    user_payload = {
-        "grade": grade,
-        "subject": subject,
-        "topic": topic,
-        "study_plan": plan_dict,
-    }
+    cached = llm_cache.get("question_generator_agent", user_payload)
+    if cached is not None:
+        return QuestionSet.model_validate(cached)
 
-    prompt = (
-        "Generate questions for the following student session:\n"
-        + json.dumps(user_payload, indent=2)
-    )
+    content = _question_content(user_payload)
 
-    content = types.Content(role="user", parts=[types.Part(text=prompt)])
-
-    response_text = None
-
-    for event in q_runner.run(
-        user_id=USER_ID,
-        session_id=SESSION_ID,
-        new_message=content,
-    ):
-        # Uncomment to inspect the event flow:
-        # print("QGEN EVENT:", event)
-        if event.is_final_response() and event.content and event.content.parts:
-            response_text = event.content.parts[0].text.strip()
+    response_text = run_to_final_text(q_runner, content)
 
     if not response_text:
         raise RuntimeError("Question generator agent did not return a final response.")
 
-    # Use the robust JSON extractor we defined earlier
+    # Trim fences/narration, then decode + validate every Question in one pydantic-core pass
     try:
-        qset_dict = extract_json_from_text(response_text)
-    except Exception as e:
-        print("Raw response_text from question_generator_agent:\n")
-        print(response_text)
-        raise e
-
-    qset = QuestionSet.model_validate(qset_dict)
-    return qset
\ No newline at end of file
+        qset = QuestionSet.model_validate_json(extract_json_text(response_text))
+    except Exception:
+        log.warning("Raw response_text from question_generator_agent:\n%s", response_text)
+        raise
+
+    llm_cache.set("question_generator_agent", user_payload, qset.model_dump(mode="json"))
+    return qset
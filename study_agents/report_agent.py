@@ -1,28 +1,38 @@
 # study_agents/report_agent.py
 
-import json
-from typing import List, Literal
+import asyncio
+from typing import Dict, List, Literal, Optional, Sequence, get_args
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
-from google.genai import types
 
-from study_agents.planner_agent import (
+from study_agents._common import (
     APP_NAME,
-    USER_ID,
-    SESSION_ID,
+    SharedGemini,
     extract_json_from_text,
+    dumps_compact,
+    user_message,
     session_service as shared_session_service,
+    arun_to_final_text,
+    run_to_final_text,
 )
-from study_agents.progress_agent import ProgressProfile, ProgressSummary
+from study_agents.progress_agent import ProgressProfile, ProgressSummary, profile_for_prompt
+from study_agents.llm_cache import llm_cache
 
 
 # ---------- Report Model ----------
 
+Audience = Literal["student", "parent", "teacher"]
+# Built once for the runtime checks on the public entry points
+VALID_AUDIENCES = frozenset(get_args(Audience))
+
 class Report(BaseModel):
-    audience: Literal["student", "parent", "teacher"] = Field(
+    # Not changed after parsing: frozen
+    model_config = ConfigDict(frozen=True, extra="ignore", populate_by_name=True)
+
+    audience: Audience = Field(
         description="Intended audience for this report."
     )
     headline: str = Field(
@@ -42,6 +52,12 @@ class Report(BaseModel):
     )
 
 
+class ReportSet(BaseModel):
+    reports: Dict[str, Report] = Field(
+        description="Mapping from audience ('student', 'parent', 'teacher') to its Report."
+    )
+
+
 # ---------- Instruction for Report Agent ----------
 
 REPORT_INSTRUCTION = """
@@ -119,12 +135,92 @@ STRICT OUTPUT RULES:
 """
 
 
+# ---------- Instruction for Multi-audience Report Agent ----------
+
+MULTI_REPORT_INSTRUCTION = """
+You are a report-writing agent for an AI Study Companion.
+
+You are given:
+1. A progress_profile object:
+   - student_id
+   - grade
+   - subject
+   - topics: mapping from topic name to:
+     - skills: mapping from skill_tag to:
+       - attempts
+       - correct
+       - accuracy (percentage)
+   - total_sessions
+   - last_topic
+   - last_percentage
+
+2. A progress_summary object:
+   - summary_text
+   - strengths: list of strengths (skills/topics)
+   - weaknesses: list of weaknesses
+   - recommended_next_topics: list of topics/skills to focus on next
+   - motivational_message
+
+3. An audiences list: one or more of "student", "parent", "teacher".
+
+Your task:
+- Produce one short, human-readable progress report for EACH audience in the list.
+- Each report must be encouraging, specific, and easy to understand.
+- The reports share the same facts but differ in tone and focus.
+
+Guidelines by audience:
+- For "student":
+  - Use friendly, encouraging language.
+  - Speak directly to the student ("You are...", "You can...", etc.).
+  - Keep sentences simple and motivating.
+
+- For "parent":
+  - Be slightly more formal.
+  - Focus on how the child is progressing and what support might help at home.
+  - Mention specific topics/skills and how the child is tracking.
+
+- For "teacher":
+  - Focus more on skills, accuracy trends, and next instructional steps.
+  - Use concise, professional language.
+  - Include suggestions for targeted practice or interventions.
+
+You must output ONLY a JSON object keyed by audience, with one entry per requested audience:
+
+{
+  "reports": {
+    "student": {
+      "audience": "student",
+      "headline": "...",
+      "strengths_sentence": "...",
+      "weaknesses_sentence": "...",
+      "next_steps_sentence": "...",
+      "bullet_points": ["...", "...", "..."]
+    },
+    "parent": { ...same keys, "audience": "parent"... },
+    "teacher": { ...same keys, "audience": "teacher"... }
+  }
+}
+
+Details:
+- headline: 1 short sentence capturing current status (e.g. "You are building strong fraction skills!")
+- strengths_sentence: 1 sentence summarizing strengths.
+- weaknesses_sentence: 1 sentence summarizing key areas to work on.
+- next_steps_sentence: 1 sentence suggesting focus for the next few sessions.
+- bullet_points: 3–6 short bullet points; each should be a crisp, standalone point.
+
+STRICT OUTPUT RULES:
+- Do NOT include any text outside the JSON.
+- Do NOT wrap the JSON in markdown or backticks.
+- The response must start with '{' and end with '}'.
+"""
+
+
 # ---------- Create Report Agent & Runner ----------
 
 MODEL_NAME = "gemini-2.0-flash"
 
 report_agent = LlmAgent(
-    model=MODEL_NAME,
+    model=SharedGemini(model=MODEL_NAME),
     name="report_agent",
     description="Turns a progress profile and summary into a short report tailored to a given audience.",
     instruction=REPORT_INSTRUCTION,
@@ -136,53 +232,170 @@ r_runner = Runner(
     session_service=shared_session_service,  # reuse the same SessionService
 )
 
+multi_report_agent = LlmAgent(
+    model=SharedGemini(model=MODEL_NAME),
+    name="multi_report_agent",
+    description="Turns a progress profile and summary into reports for several audiences in one response.",
+    instruction=MULTI_REPORT_INSTRUCTION,
+)
+
+mr_runner = Runner(
+    agent=multi_report_agent,
+    app_name=APP_NAME,
+    session_service=shared_session_service,
+)
 
-# ---------- Public function: generate_report ----------
 
-def generate_report(
+# ---------- Public functions: agenerate_report / generate_report ----------
+
+# Fixed prompt prefixes; the payload JSON is appended per call
+_REPORT_PREFIX = "Create a short progress report in JSON form for the given audience:\n"
+_MULTI_REPORT_PREFIX = "Create a short progress report in JSON form for each of the given audiences:\n"
+
+async def agenerate_report(
     profile: ProgressProfile,
     progress_summary: ProgressSummary,
-    audience: str = "student",
+    audience: Audience = "student",
+    profile_dict: Optional[dict] = None,
 ) -> Report:
     """
     Generate a human-readable progress report for the given audience
     using the numeric profile and the narrative progress summary.
+
+    Uses the async ADK runner so several reports can be awaited concurrently.
+
+    Pass `profile_dict` (progress_agent.profile_for_prompt(profile)) if the caller already has it,
+    e.g. when writing several reports for the same profile.
     """
 
-    if audience not in ("student", "parent", "teacher"):
+    if audience not in VALID_AUDIENCES:
         raise ValueError("audience must be one of: 'student', 'parent', 'teacher'")
 
     payload = {
         "audience": audience,
-        "progress_profile": profile.model_dump(),
+        "progress_profile": profile_dict if profile_dict is not None else profile_for_prompt(profile),
         "progress_summary": progress_summary.model_dump(),
     }
 
-    prompt = (
-        "Create a short progress report in JSON form for the given audience:\n"
-        + json.dumps(payload, indent=2)
-    )
-
-    content = types.Content(
-        role="user",
-        parts=[types.Part(text=prompt)],
-    )
+    cached = llm_cache.get("report_agent", payload)
+    if cached is not None:
+        return Report.model_validate(cached)
 
-    response_text = None
+    content = user_message(_REPORT_PREFIX, dumps_compact(payload))
 
-    for event in r_runner.run(
-        user_id=USER_ID,
-        session_id=SESSION_ID,
-        new_message=content,
-    ):
-        # Uncomment for debugging:
-        # print("REPORT EVENT:", event)
-        if event.is_final_response() and event.content and event.content.parts:
-            response_text = event.content.parts[0].text.strip()
+    response_text = await arun_to_final_text(r_runner, content)
 
     if not response_text:
         raise RuntimeError("Report agent did not return a final response.")
 
     report_dict = extract_json_from_text(response_text)
     report = Report.model_validate(report_dict)
-    return report
\ No newline at end of file
+    llm_cache.set("report_agent", payload, report.model_dump(mode="json"))
+    return report
+
+
+def generate_report(
+    profile: ProgressProfile,
+    progress_summary: ProgressSummary,
+    audience: Audience = "student",
+    profile_dict: Optional[dict] = None,
+) -> Report:
+    """
+    Synchronous wrapper around agenerate_report (for scripts and non-async callers).
+    """
+    return asyncio.run(
+        agenerate_report(profile, progress_summary, audience=audience, profile_dict=profile_dict)
+    )
+
+
+# ---------- Public functions: agenerate_reports_for_audiences / generate_reports_for_audiences ----------
+
+async def agenerate_reports_for_audiences(
+    profile: ProgressProfile,
+    progress_summary: ProgressSummary,
+    audiences: Sequence[Audience] = ("student", "parent", "teacher"),
+) -> Dict[str, Report]:
+    """
+    Generate one report per audience with concurrent report_agent calls, so the
+    wall-clock time is about one report instead of one per audience.
+
+    (generate_reports_multi does the same with a single, larger LLM call.)
+    """
+    audiences = list(audiences)
+    # Dump the profile once and share it across the concurrent calls
+    profile_dict = profile_for_prompt(profile)
+    reports = await asyncio.gather(
+        *(
+            agenerate_report(profile, progress_summary, audience=a, profile_dict=profile_dict)
+            for a in audiences
+        )
+    )
+    return dict(zip(audiences, reports))
+
+
+def generate_reports_for_audiences(
+    profile: ProgressProfile,
+    progress_summary: ProgressSummary,
+    audiences: Sequence[Audience] = ("student", "parent", "teacher"),
+) -> Dict[str, Report]:
+    """
+    Synchronous wrapper around agenerate_reports_for_audiences.
+    """
+    return asyncio.run(
+        agenerate_reports_for_audiences(profile, progress_summary, audiences=audiences)
+    )
+
+
+# ---------- Public function: generate_reports_multi ----------
+
+def generate_reports_multi(
+    profile: ProgressProfile,
+    progress_summary: ProgressSummary,
+    audiences: Sequence[Audience] = ("student", "parent", "teacher"),
+    profile_dict: Optional[dict] = None,
+) -> Dict[str, Report]:
+    """
+    Generate reports for several audiences with a single LLM call.
+    The profile and summary are sent once instead of once per audience.
+
+    For callers that already have a ProgressSummary. The app's analysis flow uses
+    debrief_agent.generate_full_debrief instead, which also writes the summary in
+    the same call.
+
+    Pass `profile_dict` (progress_agent.profile_for_prompt(profile)) if the caller already has it.
+
+    Returns a dict mapping each requested audience to its Report.
+    """
+
+    audiences = list(audiences)
+    if not VALID_AUDIENCES.issuperset(audiences):
+        raise ValueError("audience must be one of: 'student', 'parent', 'teacher'")
+
+    payload = {
+        "audiences": audiences,
+        "progress_profile": profile_dict if profile_dict is not None else profile_for_prompt(profile),
+        "progress_summary": progress_summary.model_dump(),
+    }
+
+    cached = llm_cache.get("multi_report_agent", payload)
+    if cached is not None:
+        report_set = ReportSet.model_validate(cached)
+        return {a: report_set.reports[a] for a in audiences}
+
+    content = user_message(_MULTI_REPORT_PREFIX, dumps_compact(payload))
+
+    response_text = run_to_final_text(mr_runner, content)
+
+    if not response_text:
+        raise RuntimeError("Multi-audience report agent did not return a final response.")
+
+    reports_dict = extract_json_from_text(response_text)
+    report_set = ReportSet.model_validate(reports_dict)
+
+    missing = [a for a in audiences if a not in report_set.reports]
+    if missing:
+        raise RuntimeError(f"Multi-audience report agent did not return reports for: {missing}")
+
+    llm_cache.set("multi_report_agent", payload, report_set.model_dump(mode="json"))
+
+    return {a: report_set.reports[a] for a in audiences}
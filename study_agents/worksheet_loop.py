@@ -1,8 +1,13 @@
 # study_agents/worksheet_loop.py
 
-from typing import List, Callable
+import asyncio
+import functools
+import inspect
+import sys
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 from study_agents.question_generator_agent import Question, QuestionSet
 
@@ -10,12 +15,18 @@ from study_agents.question_generator_agent import Question, QuestionSet
 # ---------- Models for Student Answers & Worksheet Result ----------
 
 class StudentAnswer(BaseModel):
+    # Never changed once recorded: frozen (and so hashable)
+    model_config = ConfigDict(frozen=True, extra="ignore", populate_by_name=True)
+
     question_id: int = Field(description="ID of the question answered.")
     q_type: str = Field(description="Question type: 'mcq' or 'short'.")
     student_answer: str = Field(description="The student's raw answer as entered/selected.")
 
 
 class WorksheetResult(BaseModel):
+    # Never changed once built: frozen, so the cached lookups below cannot go stale
+    model_config = ConfigDict(frozen=True, extra="ignore", populate_by_name=True)
+
     questions: List[Question] = Field(
         description="The list of questions presented in this worksheet."
     )
@@ -23,40 +34,260 @@ class WorksheetResult(BaseModel):
         description="The list of student answers, matched by question_id."
     )
 
+    # Lookups by id, built on first use (instead of scanning the lists per question)
+    @functools.cached_property
+    def answers_by_id(self) -> Dict[int, StudentAnswer]:
+        return {a.question_id: a for a in self.answers}
+
+    @functools.cached_property
+    def questions_by_id(self) -> Dict[int, Question]:
+        return {q.id: q for q in self.questions}
+
+
+# Prebuilt validator for a whole list of answers (one call per worksheet, not per answer)
+_ANSWERS_ADAPTER = TypeAdapter(List[StudentAnswer])
+
+# Results built here from an already-validated QuestionSet skip re-validation.
+# Set to False (e.g. in tests) to run the full validator on every WorksheetResult.
+TRUST_INTERNAL = True
+
+
+def _worksheet_result(questions: List[Question], answers: List[StudentAnswer]) -> WorksheetResult:
+    if TRUST_INTERNAL:
+        return WorksheetResult.model_construct(questions=questions, answers=answers)
+    return WorksheetResult(questions=questions, answers=answers)
+
+
+# ---------- Answer memo (shared across sessions, opt-in) ----------
+
+# answer key (see _answer_keys) -> answer, least recently used evicted first
+WORKSHEET_MEMO_MAXSIZE = 4096
+_worksheet_memo: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def clear_worksheet_memo() -> None:
+    """Forget every answer memoized by run_worksheet_session(..., memoize=True)."""
+    _worksheet_memo.clear()
+
+
+def _answer_keys(source: Callable, questions: List[Question], dedupe: bool, memoize: bool) -> List[tuple]:
+    """
+    One memo key per question. Questions with equal keys get a single provider call.
+    With dedupe, identical questions (same type, text and options) share a key even
+    under different ids; without it, only memoize=True shares answers (by id + text).
+    """
+    if dedupe:
+        return [(source, q.q_type, q.question_text, tuple(q.options or ())) for q in questions]
+    if memoize:
+        return [(source, q.id, q.question_text) for q in questions]
+    return [(source, i) for i in range(len(questions))]
+
 
 # ---------- Non-interactive Worksheet Session (for testing / automation) ----------
 
+def _is_async_callable(func: Optional[Callable]) -> bool:
+    """
+    True for `async def` functions, also behind functools.partial, and for objects
+    with an `async def __call__`.
+    """
+    while isinstance(func, functools.partial):
+        func = func.func
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(
+        getattr(func, "__call__", None)
+    )
+
+
+def _reject_async_providers(*providers: Optional[Callable]) -> None:
+    if any(_is_async_callable(p) for p in providers):
+        raise TypeError(
+            "Async answer providers are not supported here; "
+            "use run_worksheet_session_async instead."
+        )
+
+
 def run_worksheet_session(
     qset: QuestionSet,
     answer_provider: Callable[[Question], str],
+    memoize: bool = False,
+    batch_answer_provider: Optional[Callable[[List[Question]], List[str]]] = None,
+    batch_size: int = 1,
+    dedupe: bool = True,
 ) -> WorksheetResult:
     """
     Non-interactive worksheet runner.
 
     - qset: the QuestionSet to present.
     - answer_provider: a function that, given a Question, returns a student's answer as string.
+      Async providers raise TypeError; use run_worksheet_session_async for those.
+    - memoize: keep answers in a module-level memo shared across sessions, so an
+      expensive provider is not asked the same question twice (see clear_worksheet_memo).
+    - dedupe: ask the provider once per distinct question (same type, text and
+      options) and reuse that answer for duplicates. Turn off for providers whose
+      calls have side effects.
+    - batch_answer_provider / batch_size: with batch_size > 1, questions are answered
+      `batch_size` at a time by one batch_answer_provider call (one LLM round-trip per
+      batch instead of per question). It must return one answer per question, in order;
+      if the count does not match, that batch falls back to answer_provider.
+      Without a batch_answer_provider, answer_provider is simply called per question;
+      with one, answer_provider may be None (a count mismatch then raises ValueError).
 
     Returns a WorksheetResult containing the original questions and the collected answers.
     """
-    answers: List[StudentAnswer] = []
-
-    for q in qset.questions:
-        # Get an answer from the provided function
-        ans_text = answer_provider(q)
-
-        answers.append(
-            StudentAnswer(
-                question_id=q.id,
-                q_type=q.q_type,
-                student_answer=ans_text,
-            )
+    _reject_async_providers(answer_provider, batch_answer_provider)
+
+    rows = [
+        {"question_id": qid, "q_type": qtype, "student_answer": ans_text}
+        for qid, qtype, ans_text in _iter_answer_texts(
+            qset, answer_provider, memoize, batch_answer_provider, batch_size, dedupe
         )
+    ]
+
+    answers = _ANSWERS_ADAPTER.validate_python(rows)
+    return _worksheet_result(qset.questions, answers)
+
 
-    return WorksheetResult(
-        questions=qset.questions,
-        answers=answers,
+def run_worksheet_session_stream(
+    qset: QuestionSet,
+    answer_provider: Callable[[Question], str],
+    memoize: bool = False,
+    batch_answer_provider: Optional[Callable[[List[Question]], List[str]]] = None,
+    batch_size: int = 1,
+    dedupe: bool = True,
+) -> Iterator[StudentAnswer]:
+    """
+    Like run_worksheet_session, but yield each StudentAnswer as soon as it is
+    produced (in question order), e.g. to checkpoint or display answers while the
+    provider is still working. Same options as run_worksheet_session; with
+    batch_size > 1 all batches are answered before the first answer is yielded.
+    """
+    _reject_async_providers(answer_provider, batch_answer_provider)
+
+    for qid, qtype, ans_text in _iter_answer_texts(
+        qset, answer_provider, memoize, batch_answer_provider, batch_size, dedupe
+    ):
+        yield StudentAnswer(
+            question_id=qid,
+            q_type=qtype,
+            student_answer=ans_text,
+        )
+
+
+def _iter_answer_texts(
+    qset: QuestionSet,
+    answer_provider: Optional[Callable[[Question], str]],
+    memoize: bool,
+    batch_answer_provider: Optional[Callable[[List[Question]], List[str]]],
+    batch_size: int,
+    dedupe: bool,
+) -> Iterator[Tuple[int, str, str]]:
+    """
+    Yield (question id, q_type, answer text) in question order, calling the
+    provider once per key. Callers build the StudentAnswer objects.
+    """
+    memo = _worksheet_memo if memoize else {}
+    # Answers are memoized per provider that produced them
+    source = batch_answer_provider if batch_answer_provider is not None else answer_provider
+    keys = _answer_keys(source, qset.questions, dedupe, memoize)
+
+    if batch_size > 1:
+        _answer_in_batches(qset.questions, keys, answer_provider, batch_answer_provider, batch_size, memo)
+
+    # Bound once: the loop body runs per question
+    memo_get = memo.get
+    move_to_end = _worksheet_memo.move_to_end
+
+    for q, key in zip(qset.questions, keys):
+        # Get an answer from the provided function (once per key)
+        ans_text = memo_get(key)
+        if ans_text is None:
+            ans_text = answer_provider(q)
+            memo[key] = ans_text
+        if memoize:
+            move_to_end(key)
+            if len(_worksheet_memo) > WORKSHEET_MEMO_MAXSIZE:
+                _worksheet_memo.popitem(last=False)
+
+        yield q.id, q.q_type, ans_text
+
+
+def _answer_in_batches(
+    questions: List[Question],
+    keys: List[tuple],
+    answer_provider: Optional[Callable[[Question], str]],
+    batch_answer_provider: Optional[Callable[[List[Question]], List[str]]],
+    batch_size: int,
+    memo: dict,
+) -> None:
+    """Fill `memo` with answers to the not yet answered questions, one call per batch."""
+    if batch_answer_provider is None:
+        def batch_answer_provider(chunk: List[Question]) -> List[str]:
+            return [answer_provider(q) for q in chunk]
+
+    pending: List[Question] = []
+    pending_keys: List[tuple] = []
+    seen = set()
+    for q, key in zip(questions, keys):
+        if key not in memo and key not in seen:
+            seen.add(key)
+            pending.append(q)
+            pending_keys.append(key)
+
+    for start in range(0, len(pending), batch_size):
+        chunk = pending[start : start + batch_size]
+        texts = batch_answer_provider(chunk)
+        if len(texts) != len(chunk):
+            # Answers cannot be matched to questions by position: ask one at a time
+            if answer_provider is None:
+                raise ValueError(
+                    f"batch_answer_provider returned {len(texts)} answers for {len(chunk)} questions"
+                )
+            texts = [answer_provider(q) for q in chunk]
+        for key, ans_text in zip(pending_keys[start : start + batch_size], texts):
+            memo[key] = ans_text
+
+
+# Max answer_provider calls in flight at once (e.g. to respect an LLM grader's rate limit)
+MAX_INFLIGHT_ANSWERS = 8
+
+
+async def run_worksheet_session_async(
+    qset: QuestionSet,
+    answer_provider: Callable[[Question], Awaitable[str]],
+    max_inflight: int = MAX_INFLIGHT_ANSWERS,
+    dedupe: bool = True,
+) -> WorksheetResult:
+    """
+    Async variant of run_worksheet_session for I/O-bound answer providers.
+
+    The provider is awaited for all questions concurrently (at most `max_inflight`
+    at a time), so the wall time is close to the slowest answer instead of the
+    sum of all of them. Answers keep the order of qset.questions.
+    With dedupe, identical questions are awaited once (see run_worksheet_session).
+    """
+    semaphore = asyncio.Semaphore(max_inflight)
+
+    async def _answer(q: Question) -> str:
+        async with semaphore:
+            return await answer_provider(q)
+
+    # One call per distinct key, then scatter the answers back to every position
+    keys = _answer_keys(answer_provider, qset.questions, dedupe, memoize=False)
+    unique = {}
+    for q, key in zip(qset.questions, keys):
+        unique.setdefault(key, q)
+    unique_texts = await asyncio.gather(*(_answer(q) for q in unique.values()))
+    by_key = dict(zip(unique, unique_texts))
+    texts = [by_key[key] for key in keys]
+
+    answers = _ANSWERS_ADAPTER.validate_python(
+        [
+            {"question_id": q.id, "q_type": q.q_type, "student_answer": ans_text}
+            for q, ans_text in zip(qset.questions, texts)
+        ]
     )
 
+    return _worksheet_result(qset.questions, answers)
+
 
 # ---------- Interactive Worksheet Session (optional, for CLI use) ----------
 
@@ -64,32 +295,40 @@ def run_worksheet_session_interactive(qset: QuestionSet) -> WorksheetResult:
     """
     Simple command-line interactive version of the worksheet.
     This is mainly for local/manual testing, not for Streamlit.
-    """
-    print("Starting interactive worksheet session...")
-    answers: List[StudentAnswer] = []
 
-    for q in qset.questions:
-        print("-" * 60)
-        print(f"Q{q.id} ({q.q_type.upper()} - {q.difficulty}, skill: {q.skill_tag})")
-        print(q.question_text)
+    The whole worksheet is shown at once; answers are then read one per line,
+    in question order (an option number for MCQs). Answers can also be piped in.
+    """
+    questions = qset.questions
 
+    # Render every question into one block and write it with a single flush
+    block = ["Starting interactive worksheet session..."]
+    for q in questions:
+        block.append("-" * 60)
+        block.append(f"Q{q.id} ({q.q_type.upper()} - {q.difficulty}, skill: {q.skill_tag})")
+        block.append(q.question_text)
         if q.q_type == "mcq" and q.options:
-            for i, opt in enumerate(q.options, start=1):
-                print(f"  {i}. {opt}")
-            ans_text = input("Your choice (e.g. 1, 2, 3): ").strip()
-        else:
-            ans_text = input("Your answer: ").strip()
-
-        answers.append(
-            StudentAnswer(
-                question_id=q.id,
-                q_type=q.q_type,
-                student_answer=ans_text,
-            )
+            block.extend(f"  {i}. {opt}" for i, opt in enumerate(q.options, start=1))
+    block.append("-" * 60)
+    block.append(
+        f"Type your {len(questions)} answers, one per line in question order "
+        "(for MCQs the option number, e.g. 1, 2, 3):"
+    )
+    sys.stdout.write("\n".join(block) + "\n")
+    sys.stdout.flush()
+
+    # readline returns "" at end of input, which is recorded as a blank answer
+    stdin_readline = sys.stdin.readline
+    # readline always returns a str, so the fields need no validation here
+    answer_cls = StudentAnswer.model_construct if TRUST_INTERNAL else StudentAnswer
+    answers = [
+        answer_cls(
+            question_id=q.id,
+            q_type=q.q_type,
+            student_answer=stdin_readline().strip(),
         )
+        for q in questions
+    ]
 
-    print("\nWorksheet complete!")
-    return WorksheetResult(
-        questions=qset.questions,
-        answers=answers,
-    )
\ No newline at end of file
+    sys.stdout.write("\nWorksheet complete!\n")
+    return _worksheet_result(questions, answers)
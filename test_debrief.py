@@ -0,0 +1,102 @@
+# test_debrief.py
+
+import sys
+
+from study_agents._env import ensure_env
+
+
+def main():
+    # 1. Load env and check API key
+    ensure_env()
+
+    from study_agents.progress_agent import ProgressProfile, TopicProgress, SkillStat
+    from study_agents.evaluator_agent import (
+        QuestionEvaluation,
+        EvaluationSummary,
+        WorksheetEvaluation,
+    )
+    from study_agents.debrief_agent import generate_full_debrief, Debrief
+
+    print("GOOGLE_API_KEY found. Calling Debrief Agent on dummy progress data...\n")
+
+    # 2. Build a dummy numeric ProgressProfile (already updated with the session)
+    fractions_topic = TopicProgress(
+        skills={
+            "fractions-addition": SkillStat(attempts=10, correct=9, accuracy=90.0),
+            "fractions-of-a-quantity": SkillStat(attempts=8, correct=4, accuracy=50.0),
+        }
+    )
+
+    profile = ProgressProfile(
+        student_id="demo_student_1",
+        grade="Year 5",
+        subject="Maths",
+        topics={"Fractions": fractions_topic},
+        total_sessions=3,
+        last_topic="Fractions",
+        last_percentage=50.0,
+    )
+
+    # 3. Build a dummy evaluation for the latest session
+    evaluation = WorksheetEvaluation(
+        evaluations=[
+            QuestionEvaluation(
+                question_id=1,
+                q_type="mcq",
+                student_answer="3/4",
+                correct_answer="3/4",
+                score=1.0,
+                max_score=1.0,
+                mistake_type="correct",
+                feedback="Correct choice.",
+            ),
+            QuestionEvaluation(
+                question_id=2,
+                q_type="short",
+                student_answer="12",
+                correct_answer="15",
+                score=0.0,
+                max_score=1.0,
+                mistake_type="conceptual-error",
+                feedback="Divide 20 into 4 equal parts first, then take 3 of them.",
+            ),
+        ],
+        summary=EvaluationSummary(
+            total_questions=2,
+            total_score=1.0,
+            max_score=2.0,
+            percentage=50.0,
+        ),
+    )
+
+    # 4. Progress summary + all three reports in a single call
+    debrief: Debrief = generate_full_debrief(profile, evaluation)
+
+    summary = debrief.progress_summary
+    rule = "-" * 80
+    lines = [
+        "=== PROGRESS SUMMARY ===",
+        f"Summary: {summary.summary_text}",
+        f"Strengths: {summary.strengths}",
+        f"Weaknesses: {summary.weaknesses}",
+        f"Recommended next topics: {summary.recommended_next_topics}",
+        f"Motivational message: {summary.motivational_message}",
+        rule,
+    ]
+
+    for audience, report in debrief.reports.items():
+        lines += [
+            f"=== REPORT for {audience.upper()} ===",
+            f"Headline: {report.headline}",
+            f"Strengths: {report.strengths_sentence}",
+            f"Weaknesses: {report.weaknesses_sentence}",
+            f"Next steps: {report.next_steps_sentence}",
+            "Bullet points:" + "".join(f"\n - {bp}" for bp in report.bullet_points),
+            rule,
+        ]
+
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# test_eval_explain.py
+
+import sys
+
+from study_agents._env import ensure_env
+
+
+def main():
+    # 1. Load env and check API key
+    ensure_env()
+
+    from _fixtures import dummy_result
+    from study_agents.eval_explain_agent import evaluate_and_explain, EvalExplainBundle
+
+    print("GOOGLE_API_KEY found. Calling combined Eval + Explain Agent on a dummy worksheet...\n")
+
+    # 2. Shared tiny dummy worksheet
+    result = dummy_result()
+
+    # 3. Evaluate + explain in a single call
+    bundle: EvalExplainBundle = evaluate_and_explain(result)
+    evaluation = bundle.evaluation
+    explanations = bundle.explanations
+
+    summary = evaluation.summary
+    lines = [
+        "=== EVALUATION SUMMARY ===",
+        f"Total questions: {summary.total_questions}",
+        f"Total score: {summary.total_score} / {summary.max_score}",
+        f"Percentage: {summary.percentage}",
+        "",
+    ]
+
+    lines.append("=== PER-QUESTION DETAILS ===")
+    for ev in evaluation.evaluations:
+        lines.append(
+            f"Q{ev.question_id} ({ev.q_type})\n"
+            f"  Student answer: {ev.student_answer}\n"
+            f"  Correct answer: {ev.correct_answer}\n"
+            f"  Score: {ev.score} / {ev.max_score}\n"
+            f"  Mistake type: {ev.mistake_type}\n"
+            f"  Feedback: {ev.feedback}\n"
+            + "-" * 80
+        )
+
+    lines.append("=== EXPLANATIONS ===")
+    for expl in explanations.explanations:
+        lines.append(
+            f"Q{expl.question_id}\n"
+            f"  Hint: {expl.short_hint}\n"
+            f"  Explanation: {expl.explanation}\n"
+            + "-" * 80
+        )
+
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,14 @@
 # test_planner.py
 
-import os
-#from dotenv import load_dotenv
-from dotenv.main import load_dotenv
+import sys
 
-from study_agents.planner_agent import get_study_plan
+from study_agents._env import ensure_env
 
 def main():
-    # 1. Load environment variables from .env
-    load_dotenv()
+    # 1. Load env and check API key
+    ensure_env()
 
-    # Quick check that the API key is visible
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise RuntimeError("GOOGLE_API_KEY is not set. Check .env file.")
+    from study_agents.planner_agent import get_study_plan
 
     print("GOOGLE_API_KEY found. Calling Planner Agent...\n")
 
@@ -27,13 +22,16 @@ def main():
     )
 
     # 3. Print the result nicely
-    print("=== STUDY PLAN RESULT ===")
-    print(plan)
-    print()
-    print("Total questions:", plan.total_questions)
-    print("MCQ:", plan.mcq_count, "Short:", plan.short_count)
-    print("Difficulty distribution:", plan.difficulty_distribution)
-    print("Estimated time (mins):", plan.estimated_time_minutes)
+    lines = [
+        "=== STUDY PLAN RESULT ===",
+        f"{plan}",
+        "",
+        f"Total questions: {plan.total_questions}",
+        f"MCQ: {plan.mcq_count} Short: {plan.short_count}",
+        f"Difficulty distribution: {plan.difficulty_distribution}",
+        f"Estimated time (mins): {plan.estimated_time_minutes}",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
@@ -1,19 +1,16 @@
 # test_question_generator.py
 
-import os
-from dotenv import load_dotenv
+import sys
 
-from study_agents.planner_agent import get_study_plan
-from study_agents.question_generator_agent import generate_questions, QuestionSet, Question
+from study_agents._env import ensure_env
 
 
 def main():
-    # 1. Load environment variables
-    load_dotenv()
+    # 1. Load env and check API key
+    ensure_env()
 
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise RuntimeError("GOOGLE_API_KEY is not set. Check  .env file.")
+    from study_agents.planner_agent import get_study_plan
+    from study_agents.question_generator_agent import generate_questions, QuestionSet, Question
 
     print("GOOGLE_API_KEY found. Calling Planner + Question Generator...\n")
 
@@ -26,9 +23,7 @@ def main():
         difficulty="mixed",
     )
 
-    print("=== STUDY PLAN ===")
-    print(plan)
-    print()
+    sys.stdout.write(f"=== STUDY PLAN ===\n{plan}\n\n")
 
     # 3. Generate questions using the plan
     qset: QuestionSet = generate_questions(
@@ -38,20 +33,25 @@ def main():
         topic="Fractions",
     )
 
-    print("=== GENERATED QUESTIONS ===")
-    print(f"Total questions: {len(qset.questions)}\n")
+    questions = qset.questions  # bind once, used below
+    lines = [
+        "=== GENERATED QUESTIONS ===",
+        f"Total questions: {len(questions)}\n",
+    ]
 
-    for q in qset.questions:
-        print(f"Q{q.id} [{q.q_type.upper()} | {q.difficulty} | {q.skill_tag}]")
-        print(q.question_text)
+    for q in questions:
+        lines.append(f"Q{q.id} [{q.q_type.upper()} | {q.difficulty} | {q.skill_tag}]")
+        lines.append(q.question_text)
         if q.q_type == "mcq" and q.options:
-            print("Options:")
+            lines.append("Options:")
             for i, opt in enumerate(q.options, start=1):
-                print(f"  {i}. {opt}")
-            print("Correct option:", q.correct_option)
+                lines.append(f"  {i}. {opt}")
+            lines.append(f"Correct option: {q.correct_option}")
         elif q.q_type == "short":
-            print("Correct answer:", q.answer)
-        print("-" * 80)
+            lines.append(f"Correct answer: {q.answer}")
+        lines.append("-" * 80)
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
@@ -1,18 +1,21 @@
 # test_report.py
 
-import os
-from dotenv import load_dotenv
+import sys
 
-from study_agents.progress_agent import ProgressProfile, TopicProgress, SkillStat, ProgressSummary
-from study_agents.report_agent import generate_report, Report
+from study_agents._env import ensure_env
 
 
 def main():
     # 1. Load env and check API key
-    load_dotenv()
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise RuntimeError("GOOGLE_API_KEY is not set. Check .env file.")
+    ensure_env()
+
+    from study_agents.progress_agent import (
+        ProgressProfile,
+        TopicProgress,
+        SkillStat,
+        ProgressSummary,
+    )
+    from study_agents.report_agent import generate_reports_for_audiences
 
     print("GOOGLE_API_KEY found. Calling Report Agent on dummy progress data...\n")
 
@@ -46,19 +49,22 @@ def main():
         motivational_message="You're doing well—keep practicing fractions of a quantity and you'll improve quickly!",
     )
 
-    # 4. Generate reports for each audience type (student, parent, teacher)
-    for audience in ("student", "parent", "teacher"):
-        print(f"=== REPORT for {audience.upper()} ===")
-        report: Report = generate_report(profile, progress_summary, audience=audience)
-        print("Audience:", report.audience)
-        print("Headline:", report.headline)
-        print("Strengths:", report.strengths_sentence)
-        print("Weaknesses:", report.weaknesses_sentence)
-        print("Next steps:", report.next_steps_sentence)
-        print("Bullet points:")
-        for bp in report.bullet_points:
-            print(" -", bp)
-        print("-" * 80)
+    # 4. Generate reports for each audience type (student, parent, teacher);
+    #    the three report_agent calls run concurrently
+    reports = generate_reports_for_audiences(profile, progress_summary)
+    rule = "-" * 80
+    for audience, report in reports.items():
+        sys.stdout.write(f"=== REPORT for {audience.upper()} ===\n")
+        lines = [
+            f"Audience: {report.audience}",
+            f"Headline: {report.headline}",
+            f"Strengths: {report.strengths_sentence}",
+            f"Weaknesses: {report.weaknesses_sentence}",
+            f"Next steps: {report.next_steps_sentence}",
+            "Bullet points:" + "".join(f"\n - {bp}" for bp in report.bullet_points),
+            rule,
+        ]
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
@@ -1,19 +1,17 @@
 # test_worksheet_loop.py
 
-import os
-from dotenv import load_dotenv
+import sys
 
-from study_agents.planner_agent import get_study_plan
-from study_agents.question_generator_agent import generate_questions, QuestionSet, Question
-from study_agents.worksheet_loop import run_worksheet_session, WorksheetResult, StudentAnswer
+from study_agents._env import ensure_env
 
 
 def main():
-    # 1. Load env
-    load_dotenv()
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise RuntimeError("GOOGLE_API_KEY is not set. Check .env file.")
+    # 1. Load env and check API key
+    ensure_env()
+
+    from study_agents.planner_agent import get_study_plan
+    from study_agents.question_generator_agent import generate_questions, QuestionSet, Question
+    from study_agents.worksheet_loop import run_worksheet_session, WorksheetResult, StudentAnswer
 
     print("GOOGLE_API_KEY found. Running Planner + Question Generator + Worksheet Loop...\n")
 
@@ -26,9 +24,7 @@ def main():
         difficulty="mixed",
     )
 
-    print("=== STUDY PLAN ===")
-    print(plan)
-    print()
+    sys.stdout.write(f"=== STUDY PLAN ===\n{plan}\n\n")
 
     # 3. Generate questions
     qset: QuestionSet = generate_questions(
@@ -38,16 +34,20 @@ def main():
         topic="Fractions",
     )
     
-    print("=== GENERATED QUESTIONS ===")
-    print(f"Total questions: {len(qset.questions)}")
-    print()
-    print("LOOP 2")
-    for q in qset.questions:
-        print(f"Q{q.id} [{q.q_type.upper()} | {q.difficulty} | {q.skill_tag}]")
-        print(q.question_text)
-        print("-" * 40)
-    print()
-    print("LOOP 3")
+    questions = qset.questions  # bind once, used below
+    lines = [
+        "=== GENERATED QUESTIONS ===",
+        f"Total questions: {len(questions)}",
+        "",
+        "LOOP 2",
+    ]
+    for q in questions:
+        lines.append(f"Q{q.id} [{q.q_type.upper()} | {q.difficulty} | {q.skill_tag}]")
+        lines.append(q.question_text)
+        lines.append("-" * 40)
+    lines += ["", "LOOP 3"]
+    sys.stdout.write("\n".join(lines) + "\n")
+
     # 4. Define a dummy answer provider (non-interactive)
     def dummy_answer_provider(q: Question) -> str:
         # For MCQ, pretend student always picks option 1
@@ -59,9 +59,10 @@ def main():
     # 5. Run worksheet session (non-interactive)
     result: WorksheetResult = run_worksheet_session(qset, answer_provider=dummy_answer_provider)
 
-    print("=== WORKSHEET RESULT (Student Answers) ===")
+    lines = ["=== WORKSHEET RESULT (Student Answers) ==="]
     for ans in result.answers:
-        print(f"Q{ans.question_id} ({ans.q_type}) -> {ans.student_answer}")
+        lines.append(f"Q{ans.question_id} ({ans.q_type}) -> {ans.student_answer}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
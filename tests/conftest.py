@@ -0,0 +1,10 @@
+# tests/conftest.py
+
+import os
+import tempfile
+
+# Set before any study_agents module is imported: keep the agent-response cache in
+# memory and the progress DB in a throwaway directory, so tests never touch the
+# files the app uses.
+os.environ["LLM_CACHE_PATH"] = ""
+os.environ["PROGRESS_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="study_tests_"), "progress.db")
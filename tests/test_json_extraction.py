@@ -0,0 +1,73 @@
+# tests/test_json_extraction.py
+
+import json
+
+import pytest
+
+from study_agents._common import _first_json_object, extract_json_from_text, extract_json_text
+
+
+# ---------- _first_json_object ----------
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"a": 1}', '{"a": 1}'),
+        ('Here you go: {"a": 1} hope that helps', '{"a": 1}'),
+        ('{"a": {"b": {"c": [1, {"d": 2}]}}} trailing', '{"a": {"b": {"c": [1, {"d": 2}]}}}'),
+        ('{"a": "x}y{z"} {"b": 2}', '{"a": "x}y{z"}'),
+        ('{"a": "quote \\" then }"}', '{"a": "quote \\" then }"}'),
+        ('{"a": "backslash \\\\"} and }', '{"a": "backslash \\\\"}'),
+    ],
+    ids=["plain", "narration", "nested", "braces-in-string", "escaped-quote", "escaped-backslash"],
+)
+def test_first_json_object(text, expected):
+    start, end = _first_json_object(text)
+    assert text[start:end] == expected
+
+
+@pytest.mark.parametrize("text", ["no json here", "", '{"a": 1', '{"a": "}"'])
+def test_first_json_object_without_a_complete_object(text):
+    assert _first_json_object(text) == (-1, -1)
+
+
+# ---------- extract_json_text ----------
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '```json\n{"a": {"b": "}"}}\n```',
+        '```\n{"a": {"b": "}"}}\n```',
+        '  {"a": {"b": "}"}}  ',
+        'Sure! {"a": {"b": "}"}} Let me know {if} you need more.',
+    ],
+    ids=["json-fence", "bare-fence", "whitespace", "narration"],
+)
+def test_extract_json_text(text):
+    assert json.loads(extract_json_text(text)) == {"a": {"b": "}"}}
+
+
+@pytest.mark.parametrize("text", ["", None, "no object at all", "```json\n[1, 2]\n```"])
+def test_extract_json_text_rejects_output_without_an_object(text):
+    with pytest.raises(ValueError):
+        extract_json_text(text)
+
+
+# ---------- extract_json_from_text ----------
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '```json\n{"a": [1, {"b": "{x}"}]}\n```',
+        'Here is the JSON: {"a": [1, {"b": "{x}"}]} -- done }',
+    ],
+    ids=["fence", "narration"],
+)
+def test_extract_json_from_text(text):
+    assert extract_json_from_text(text) == {"a": [1, {"b": "{x}"}]}
+
+
+@pytest.mark.parametrize("text", ["", "nothing to parse"])
+def test_extract_json_from_text_rejects_output_without_an_object(text):
+    with pytest.raises(ValueError):
+        extract_json_from_text(text)
@@ -0,0 +1,114 @@
+# tests/test_llm_cache.py
+
+import sqlite3
+
+from study_agents.llm_cache import LLMCache, cache_key
+
+
+# ---------- cache_key ----------
+
+def test_cache_key_ignores_key_order():
+    assert cache_key("a", {"x": 1, "y": [1, 2]}) == cache_key("a", {"y": [1, 2], "x": 1})
+
+
+def test_cache_key_keeps_case_and_spacing_of_strings():
+    assert cache_key("a", {"answer": "x"}) != cache_key("a", {"answer": "X"})
+    assert cache_key("a", {"topic": "Fractions"}) != cache_key("a", {"topic": " fractions "})
+
+
+def test_cache_key_depends_on_agent():
+    assert cache_key("planner_agent", {"x": 1}) != cache_key("report_agent", {"x": 1})
+
+
+# ---------- LLMCache ----------
+
+def test_memory_only_cache_round_trip():
+    cache = LLMCache(path="")
+
+    assert cache.get("a", {"q": "x"}) is None
+    cache.set("a", {"q": "x"}, {"out": 1})
+
+    assert cache.get("a", {"q": "x"}) == {"out": 1}
+    assert cache.get("a", {"q": "X"}) is None
+
+
+def test_lru_evicts_oldest_entry():
+    cache = LLMCache(path="", max_entries=2)
+    cache.set("a", 1, {"v": 1})
+    cache.set("a", 2, {"v": 2})
+    cache.get("a", 1)  # 1 is now the most recently used
+    cache.set("a", 3, {"v": 3})
+
+    assert cache.get("a", 2) is None
+    assert cache.get("a", 1) == {"v": 1}
+    assert cache.get("a", 3) == {"v": 3}
+
+
+def test_sqlite_entries_survive_a_new_cache_object(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite3")
+    LLMCache(path=path).set("a", {"q": "x"}, {"out": [1, 2]})
+
+    fresh = LLMCache(path=path)
+    assert fresh.get("a", {"q": "x"}) == {"out": [1, 2]}
+
+    fresh.clear()
+    assert LLMCache(path=path).get("a", {"q": "x"}) is None
+
+
+# ---------- Expiry and row cap ----------
+
+def test_expired_entries_are_not_served(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("study_agents.llm_cache.time.time", lambda: clock[0])
+    path = str(tmp_path / "llm_cache.sqlite3")
+    cache = LLMCache(path=path, ttl_seconds=60)
+    cache.set("a", 1, {"v": 1})
+
+    clock[0] += 59
+    assert cache.get("a", 1) == {"v": 1}
+    assert LLMCache(path=path, ttl_seconds=60).get("a", 1) == {"v": 1}
+
+    clock[0] += 2
+    assert cache.get("a", 1) is None
+    assert LLMCache(path=path, ttl_seconds=60).get("a", 1) is None
+
+
+def test_expired_rows_are_deleted_on_open(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("study_agents.llm_cache.time.time", lambda: clock[0])
+    path = str(tmp_path / "llm_cache.sqlite3")
+    LLMCache(path=path, ttl_seconds=60).set("a", 1, {"v": 1})
+
+    clock[0] += 120
+    LLMCache(path=path, ttl_seconds=60).get("a", 2)
+
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM llm_cache").fetchone() == (0,)
+
+
+def test_row_cap_drops_the_oldest_rows(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("study_agents.llm_cache.time.time", lambda: clock[0])
+    monkeypatch.setattr("study_agents.llm_cache.PRUNE_EVERY", 1)
+    path = str(tmp_path / "llm_cache.sqlite3")
+    cache = LLMCache(path=path, max_rows=2)
+    for i in range(4):
+        clock[0] += 1
+        cache.set("a", i, {"v": i})
+
+    fresh = LLMCache(path=path, max_rows=2)
+    assert [fresh.get("a", i) for i in range(4)] == [None, None, {"v": 2}, {"v": 3}]
+
+
+def test_table_without_created_at_is_migrated(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite3")
+    old = sqlite3.connect(path)
+    old.execute("CREATE TABLE llm_cache (key TEXT PRIMARY KEY, agent TEXT NOT NULL, value TEXT NOT NULL)")
+    old.execute("INSERT INTO llm_cache VALUES ('k', 'a', '{}')")
+    old.commit()
+
+    cache = LLMCache(path=path)
+    cache.get("a", 1)  # opens (and migrates) the table
+    # Rows written before expiry existed count as expired
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM llm_cache").fetchone() == (0,)
+    cache.set("a", 1, {"v": 1})
+    assert LLMCache(path=path).get("a", 1) == {"v": 1}
@@ -0,0 +1,281 @@
+# tests/test_mcq_grading.py
+
+import asyncio
+import json
+
+import pytest
+
+from services.study_flow import (
+    _grade_mcqs_locally,
+    _merge_evaluations,
+    _normalize_answer,
+    _resolve_option,
+)
+from study_agents import eval_explain_agent
+from study_agents.evaluator_agent import QuestionEvaluation
+from study_agents.question_generator_agent import Question
+from study_agents.worksheet_loop import StudentAnswer, WorksheetResult
+
+
+# ---------- Helpers ----------
+
+def mcq(qid, options=("3/4", "1/4", "2/4"), correct="3/4"):
+    return Question(
+        id=qid,
+        q_type="mcq",
+        question_text=f"MCQ {qid}",
+        options=list(options) if options is not None else None,
+        correct_option=correct,
+        difficulty="easy",
+        skill_tag="fractions-addition",
+    )
+
+
+def short(qid, answer="15"):
+    return Question(
+        id=qid,
+        q_type="short",
+        question_text=f"Short {qid}",
+        answer=answer,
+        difficulty="medium",
+        skill_tag="fractions-of-a-quantity",
+    )
+
+
+def worksheet(questions, answers):
+    return WorksheetResult(
+        questions=questions,
+        answers=[
+            StudentAnswer(question_id=qid, q_type=q_type, student_answer=text)
+            for qid, q_type, text in answers
+        ],
+    )
+
+
+def evaluation(qid, score, q_type="short", mistake_type="correct"):
+    return QuestionEvaluation(
+        question_id=qid,
+        q_type=q_type,
+        student_answer="x",
+        correct_answer="y",
+        score=score,
+        max_score=1.0,
+        mistake_type=mistake_type,
+        feedback="f",
+    )
+
+
+# ---------- _normalize_answer ----------
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        (None, ""),
+        ("", ""),
+        ("  3/4  ", "3/4"),
+        ("Three   Quarters\n", "three quarters"),
+        ("B", "b"),
+    ],
+)
+def test_normalize_answer(text, expected):
+    assert _normalize_answer(text) == expected
+
+
+# ---------- _resolve_option ----------
+
+@pytest.mark.parametrize(
+    "answer, expected",
+    [
+        ("3/4", "3/4"),     # option text
+        (" 1/4 ", "1/4"),   # option text, extra whitespace
+        ("2", "1/4"),       # 1-based option number
+        ("c", "2/4"),       # option letter
+        ("C", "2/4"),
+        ("4", None),        # number out of range
+        ("d", None),        # letter out of range
+        ("0", None),
+        ("", None),
+        ("   ", None),
+        ("five", None),
+    ],
+)
+def test_resolve_option(answer, expected):
+    assert _resolve_option(mcq(1), answer) == expected
+
+
+def test_resolve_option_text_first_for_correct_option():
+    q = mcq(1, options=["2", "1", "3"], correct="2")
+    assert _resolve_option(q, "1") == "1"
+    assert _resolve_option(q, "3") == "3"
+
+
+def test_resolve_option_number_first_for_student_answers():
+    q = mcq(1, options=["2", "1", "3"], correct="2")
+    assert _resolve_option(q, "1", number_first=True) == "2"
+    assert _resolve_option(q, "3", number_first=True) == "3"
+    # Free-form input still falls back to option text and letters
+    assert _resolve_option(mcq(2), "1/4", number_first=True) == "1/4"
+    assert _resolve_option(mcq(2), "c", number_first=True) == "2/4"
+    assert _resolve_option(mcq(3, options=["10", "20"]), "20", number_first=True) == "20"
+
+
+def test_resolve_option_without_options():
+    assert _resolve_option(mcq(1, options=None), "1") is None
+
+
+# ---------- _grade_mcqs_locally ----------
+
+def test_grade_mcqs_locally_scores_mcqs_and_leaves_the_rest():
+    result = worksheet(
+        [mcq(1), mcq(2), mcq(3), short(4), mcq(5, correct="7/8")],
+        [(1, "mcq", "1"), (2, "mcq", "b"), (3, "mcq", "  "), (4, "short", "15"), (5, "mcq", "1")],
+    )
+
+    graded, remaining = _grade_mcqs_locally(result)
+
+    by_qid = {ev.question_id: ev for ev in graded}
+    assert sorted(by_qid) == [1, 2, 3]
+    assert (by_qid[1].score, by_qid[1].mistake_type, by_qid[1].correct_answer) == (1.0, "correct", "3/4")
+    assert (by_qid[2].score, by_qid[2].mistake_type) == (0.0, "incorrect")
+    assert (by_qid[3].score, by_qid[3].mistake_type) == (0.0, "blank")
+    assert by_qid[1].student_answer == "1"
+    # Short answers and MCQs whose correct_option matches no option go to the LLM
+    assert [q.id for q in remaining] == [4, 5]
+
+
+def test_grade_mcqs_locally_numeric_option_texts():
+    # The app sends the radio position, so "1" means the first option ("2"), not option "1"
+    q = mcq(1, options=["2", "1", "3", "4"], correct="2")
+
+    picked_first, _ = _grade_mcqs_locally(worksheet([q], [(1, "mcq", "1")]))
+    picked_second, _ = _grade_mcqs_locally(worksheet([q], [(1, "mcq", "2")]))
+
+    assert (picked_first[0].score, picked_first[0].mistake_type) == (1.0, "correct")
+    assert (picked_second[0].score, picked_second[0].mistake_type) == (0.0, "incorrect")
+
+
+def test_grade_mcqs_locally_missing_answer_is_blank():
+    graded, remaining = _grade_mcqs_locally(worksheet([mcq(1)], []))
+
+    assert remaining == []
+    assert (graded[0].student_answer, graded[0].score, graded[0].mistake_type) == ("", 0.0, "blank")
+
+
+def test_grade_mcqs_locally_correct_option_given_as_number():
+    result = worksheet([mcq(1, correct="1")], [(1, "mcq", "3/4")])
+
+    graded, _ = _grade_mcqs_locally(result)
+
+    assert (graded[0].correct_answer, graded[0].score) == ("3/4", 1.0)
+
+
+# ---------- _merge_evaluations ----------
+
+def test_merge_evaluations_worksheet_order_and_summary():
+    result = worksheet(
+        [mcq(1), short(2), short(3)],
+        [(1, "mcq", "1"), (2, "short", "15"), (3, "short", "10")],
+    )
+    local = [evaluation(1, 1.0, q_type="mcq")]
+    llm = [evaluation(3, 0.5, mistake_type="minor-error"), evaluation(2, 1.0), evaluation(1, 0.0)]
+
+    merged = _merge_evaluations(result, local, llm)
+
+    assert [ev.question_id for ev in merged.evaluations] == [1, 2, 3]
+    assert merged.evaluations[0].score == 1.0  # local grading wins over the LLM
+    assert merged.summary.total_questions == 3
+    assert merged.summary.total_score == 2.5
+    assert merged.summary.max_score == 3.0
+    assert merged.summary.percentage == 83.33
+
+
+def test_merge_evaluations_fills_questions_the_llm_left_out():
+    result = worksheet(
+        [mcq(1), short(2, answer="15")],
+        [(1, "mcq", "1"), (2, "short", "12")],
+    )
+
+    merged = _merge_evaluations(result, [evaluation(1, 1.0, q_type="mcq")], [])
+
+    filled = merged.evaluations[1]
+    assert (filled.question_id, filled.student_answer, filled.correct_answer) == (2, "12", "15")
+    assert (filled.score, filled.max_score, filled.mistake_type) == (0.0, 1.0, "other")
+    # The gap still counts, so the percentage is not inflated
+    assert merged.summary.total_questions == 2
+    assert merged.summary.percentage == 50.0
+
+
+def test_merge_evaluations_ignores_unknown_question_ids():
+    result = worksheet([short(1)], [(1, "short", "15")])
+
+    merged = _merge_evaluations(result, [], [evaluation(1, 1.0), evaluation(99, 1.0)])
+
+    assert [ev.question_id for ev in merged.evaluations] == [1]
+    assert merged.summary.max_score == 1.0
+
+
+# ---------- Eval + Explain payload with pre-graded MCQs ----------
+
+def fake_eval_explain_agent(monkeypatch, sent):
+    """Stand in for the agent call: record the prompt, answer Q2 only."""
+    async def fake_arun_to_final_text(runner, content):
+        sent.append(content.parts[0].text)
+        return json.dumps(
+            {
+                "evaluations": [evaluation(2, 0.0, mistake_type="incorrect").model_dump()],
+                "summary": {"total_questions": 1, "total_score": 0, "max_score": 1, "percentage": 0},
+                "explanations": [
+                    {"question_id": qid, "short_hint": "h", "explanation": "e"} for qid in (1, 2)
+                ],
+            }
+        )
+
+    monkeypatch.setattr(eval_explain_agent, "get_eval_explain_runner", lambda: None)
+    monkeypatch.setattr(eval_explain_agent, "arun_to_final_text", fake_arun_to_final_text)
+
+
+def sent_payload(prompt):
+    return json.loads(prompt[prompt.index("{"):])
+
+
+def test_evaluate_and_explain_sends_only_remaining_questions(monkeypatch):
+    result = worksheet(
+        [mcq(1), short(2)],
+        [(1, "mcq", "1"), (2, "short", "12")],
+    )
+    pre_graded, _ = _grade_mcqs_locally(result)
+    sent = []
+    fake_eval_explain_agent(monkeypatch, sent)
+
+    bundle = asyncio.run(eval_explain_agent.aevaluate_and_explain(result, pre_graded=pre_graded))
+
+    payload = sent_payload(sent[0])
+    assert [q["id"] for q in payload["worksheet_result"]["questions"]] == [2]
+    assert [a["question_id"] for a in payload["worksheet_result"]["answers"]] == [2]
+    assert payload["pre_graded_questions"] == [
+        {
+            "question_id": 1,
+            "question_text": "MCQ 1",
+            "options": ["3/4", "1/4", "2/4"],
+            "student_answer": "1",
+            "correct_answer": "3/4",
+            "mistake_type": "correct",
+        }
+    ]
+    assert [ev.question_id for ev in bundle.evaluation.evaluations] == [2]
+    assert [e.question_id for e in bundle.explanations.explanations] == [1, 2]
+
+
+def test_evaluate_and_explain_without_pre_graded_sends_whole_worksheet(monkeypatch):
+    result = worksheet(
+        [mcq(1), short(2)],
+        [(1, "mcq", "1"), (2, "short", "12")],
+    )
+    sent = []
+    fake_eval_explain_agent(monkeypatch, sent)
+
+    asyncio.run(eval_explain_agent.aevaluate_and_explain(result, result_json=result.model_dump_json()))
+
+    payload = sent_payload(sent[0])
+    assert [q["id"] for q in payload["worksheet_result"]["questions"]] == [1, 2]
+    assert "pre_graded_questions" not in payload
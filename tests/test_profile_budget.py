@@ -0,0 +1,64 @@
+# tests/test_profile_budget.py
+
+from study_agents._common import dumps_compact, estimate_tokens
+from study_agents.progress_agent import (
+    ProgressProfile,
+    SkillStat,
+    TopicProgress,
+    profile_for_prompt,
+)
+
+
+# ---------- Helpers ----------
+
+def profile_with(attempts_by_topic, last_topic=""):
+    return ProgressProfile(
+        student_id="s1",
+        grade="Year 5",
+        subject="Maths",
+        topics={
+            name: TopicProgress(
+                skills={f"{name}_skill_{i}": SkillStat(attempts=attempts, correct=0) for i in range(5)}
+            )
+            for name, attempts in attempts_by_topic.items()
+        },
+        last_topic=last_topic,
+    )
+
+
+# ---------- profile_for_prompt ----------
+
+def test_profile_under_budget_is_unchanged():
+    profile = profile_with({"Fractions": 3, "Decimals": 1})
+
+    assert profile_for_prompt(profile, token_budget=10_000) == profile.model_dump()
+
+
+def test_profile_over_budget_drops_least_practiced_topics():
+    profile = profile_with({"Fractions": 9, "Decimals": 1, "Angles": 5})
+    dumped = profile.model_dump()
+    # Room for the profile fields and exactly one topic
+    budget = estimate_tokens(dumps_compact({**dumped, "topics": {}})) + estimate_tokens(
+        dumps_compact({"Fractions": dumped["topics"]["Fractions"]})
+    )
+
+    trimmed = profile_for_prompt(profile, token_budget=budget)
+
+    assert list(trimmed["topics"]) == ["Fractions"]
+    assert trimmed["student_id"] == "s1"
+
+
+def test_profile_over_budget_keeps_last_topic():
+    profile = profile_with({"Fractions": 9, "Decimals": 1}, last_topic="Decimals")
+
+    trimmed = profile_for_prompt(profile, token_budget=1)
+
+    assert list(trimmed["topics"]) == ["Decimals"]
+
+
+def test_profile_for_prompt_leaves_profile_alone():
+    profile = profile_with({"Fractions": 9, "Decimals": 1})
+
+    profile_for_prompt(profile, token_budget=1)
+
+    assert set(profile.topics) == {"Fractions", "Decimals"}
@@ -0,0 +1,81 @@
+# tests/test_progress_store.py
+
+import sqlite3
+
+from pydantic import BaseModel
+
+from study_agents.progress_store import ProgressStore
+
+
+class Profile(BaseModel):
+    student_id: str
+    total_sessions: int
+
+
+def profile(sid, sessions=1):
+    return Profile(student_id=sid, total_sessions=sessions)
+
+
+# ---------- In-process LRU ----------
+
+def test_get_missing_key_returns_none(tmp_path):
+    assert ProgressStore(str(tmp_path / "p.db"), Profile).get("nobody") is None
+
+
+def test_hot_reads_are_served_from_the_lru(tmp_path):
+    store = ProgressStore(str(tmp_path / "p.db"), Profile)
+    store.put("s1", profile("s1"))
+    store._conn.execute("DELETE FROM profiles")
+
+    assert store.get("s1") == profile("s1")
+
+
+def test_get_returns_a_copy_callers_can_mutate(tmp_path):
+    store = ProgressStore(str(tmp_path / "p.db"), Profile)
+    p = profile("s1")
+    store.put("s1", p)
+    p.total_sessions = 99  # the caller's object is not the cached one
+
+    first = store.get("s1")
+    first.total_sessions += 1
+
+    assert first is not store.get("s1")
+    assert store.get("s1").total_sessions == 1
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    store = ProgressStore(str(tmp_path / "p.db"), Profile, max_cached=2)
+    store.put("s1", profile("s1"))
+    store.put("s2", profile("s2"))
+    store.get("s1")  # s1 is now the most recently used
+    store.put("s3", profile("s3"))
+
+    assert list(store._lru) == ["s1", "s3"]
+    # Evicted entries are still read back from SQLite
+    assert store.get("s2") == profile("s2")
+    assert list(store._lru) == ["s3", "s2"]
+
+
+# ---------- SQLite ----------
+
+def test_profiles_survive_a_new_store_object(tmp_path):
+    path = str(tmp_path / "p.db")
+    store = ProgressStore(path, Profile)
+    store.put("s1", profile("s1", 1))
+    store.put("s1", profile("s1", 2))  # replaces the row
+    store.put("s2", profile("s2", 5))
+
+    fresh = ProgressStore(path, Profile)
+    assert fresh.get("s1") == profile("s1", 2)
+    assert fresh.get("s2") == profile("s2", 5)
+    assert fresh.get("s3") is None
+
+    rows = sqlite3.connect(path).execute("SELECT COUNT(*) FROM profiles").fetchone()
+    assert rows == (2,)
+
+
+def test_store_does_not_touch_the_disk_until_used(tmp_path):
+    path = tmp_path / "p.db"
+    ProgressStore(str(path), Profile)
+
+    assert not path.exists()
@@ -0,0 +1,225 @@
+# tests/test_worksheet_session.py
+
+import asyncio
+import functools
+
+import pytest
+
+from study_agents import worksheet_loop
+from study_agents.question_generator_agent import Question, QuestionSet
+from study_agents.worksheet_loop import (
+    clear_worksheet_memo,
+    run_worksheet_session,
+    run_worksheet_session_async,
+    run_worksheet_session_stream,
+)
+
+
+# ---------- Helpers ----------
+
+def qset_of(*texts):
+    return QuestionSet(
+        questions=[
+            Question(
+                id=i,
+                q_type="short",
+                question_text=text,
+                answer="1",
+                difficulty="easy",
+                skill_tag="s",
+            )
+            for i, text in enumerate(texts, start=1)
+        ]
+    )
+
+
+async def async_provider(q):
+    return q.question_text.upper()
+
+
+class AsyncCallable:
+    async def __call__(self, q):
+        return q.question_text
+
+
+# ---------- Sync runners reject async providers ----------
+
+@pytest.mark.parametrize(
+    "provider",
+    [
+        async_provider,
+        functools.partial(async_provider),
+        AsyncCallable(),
+        functools.partial(AsyncCallable()),
+    ],
+    ids=["async-def", "partial", "async-call", "partial-async-call"],
+)
+def test_sync_runners_reject_async_providers(provider):
+    with pytest.raises(TypeError, match="run_worksheet_session_async"):
+        run_worksheet_session(qset_of("x"), provider)
+    with pytest.raises(TypeError, match="run_worksheet_session_async"):
+        list(run_worksheet_session_stream(qset_of("x"), provider))
+
+
+def test_sync_runner_rejects_async_batch_provider():
+    async def batch_provider(chunk):
+        return [q.question_text for q in chunk]
+
+    with pytest.raises(TypeError):
+        run_worksheet_session(qset_of("x"), None, batch_answer_provider=batch_provider, batch_size=2)
+
+
+# ---------- Async runner ----------
+
+def test_run_worksheet_session_async():
+    result = asyncio.run(run_worksheet_session_async(qset_of("x", "y", "x"), async_provider))
+
+    assert [a.student_answer for a in result.answers] == ["X", "Y", "X"]
+
+
+# ---------- Answer memo ----------
+
+def counting_provider(calls):
+    def provider(q):
+        calls.append(q.id)
+        return q.question_text.upper()
+
+    return provider
+
+
+def test_memoize_reuses_answers_across_sessions():
+    clear_worksheet_memo()
+    calls = []
+    provider = counting_provider(calls)
+
+    first = run_worksheet_session(qset_of("a", "b"), provider, memoize=True)
+    second = run_worksheet_session(qset_of("a", "b"), provider, memoize=True)
+
+    assert calls == [1, 2]
+    assert [a.student_answer for a in second.answers] == [a.student_answer for a in first.answers]
+    clear_worksheet_memo()
+
+
+def test_without_memoize_each_session_asks_again():
+    clear_worksheet_memo()
+    calls = []
+    provider = counting_provider(calls)
+
+    run_worksheet_session(qset_of("a"), provider)
+    run_worksheet_session(qset_of("a"), provider)
+
+    assert calls == [1, 1]
+
+
+def test_clear_worksheet_memo_forgets_answers():
+    clear_worksheet_memo()
+    calls = []
+    provider = counting_provider(calls)
+
+    run_worksheet_session(qset_of("a"), provider, memoize=True)
+    clear_worksheet_memo()
+    run_worksheet_session(qset_of("a"), provider, memoize=True)
+
+    assert calls == [1, 1]
+
+
+def test_memo_evicts_least_recently_used(monkeypatch):
+    clear_worksheet_memo()
+    monkeypatch.setattr(worksheet_loop, "WORKSHEET_MEMO_MAXSIZE", 2)
+    calls = []
+    provider = counting_provider(calls)
+
+    run_worksheet_session(qset_of("a", "b", "c"), provider, memoize=True)
+    assert len(worksheet_loop._worksheet_memo) == 2
+
+    calls.clear()
+    run_worksheet_session(qset_of("a"), provider, memoize=True)
+    assert calls == [1]  # "a" was evicted
+    clear_worksheet_memo()
+
+
+# ---------- Batched answers ----------
+
+def test_batch_provider_answers_in_chunks():
+    chunks = []
+
+    def batch_provider(chunk):
+        chunks.append([q.id for q in chunk])
+        return [q.question_text.upper() for q in chunk]
+
+    result = run_worksheet_session(
+        qset_of("a", "b", "c"), None, batch_answer_provider=batch_provider, batch_size=2
+    )
+
+    assert chunks == [[1, 2], [3]]
+    assert [a.student_answer for a in result.answers] == ["A", "B", "C"]
+
+
+def test_batch_count_mismatch_falls_back_to_answer_provider():
+    calls = []
+
+    result = run_worksheet_session(
+        qset_of("a", "b"),
+        counting_provider(calls),
+        batch_answer_provider=lambda chunk: ["only one"],
+        batch_size=2,
+    )
+
+    assert calls == [1, 2]
+    assert [a.student_answer for a in result.answers] == ["A", "B"]
+
+
+def test_batch_count_mismatch_without_answer_provider_raises():
+    with pytest.raises(ValueError, match="1 answers for 2 questions"):
+        run_worksheet_session(
+            qset_of("a", "b"), None, batch_answer_provider=lambda chunk: ["x"], batch_size=2
+        )
+
+
+def test_batch_size_without_batch_provider_calls_per_question():
+    calls = []
+
+    result = run_worksheet_session(qset_of("a", "b", "c"), counting_provider(calls), batch_size=2)
+
+    assert calls == [1, 2, 3]
+    assert [a.student_answer for a in result.answers] == ["A", "B", "C"]
+
+
+# ---------- Deduplication ----------
+
+def test_dedupe_asks_once_per_distinct_question():
+    calls = []
+
+    result = run_worksheet_session(qset_of("a", "b", "a"), counting_provider(calls))
+
+    assert calls == [1, 2]
+    assert [a.question_id for a in result.answers] == [1, 2, 3]
+    assert [a.student_answer for a in result.answers] == ["A", "B", "A"]
+
+
+def test_dedupe_off_asks_for_every_question():
+    calls = []
+
+    run_worksheet_session(qset_of("a", "b", "a"), counting_provider(calls), dedupe=False)
+
+    assert calls == [1, 2, 3]
+
+
+def test_dedupe_keeps_questions_with_different_options_apart():
+    def mcq(qid, options):
+        return Question(
+            id=qid,
+            q_type="mcq",
+            question_text="Pick one",
+            options=options,
+            answer=options[0],
+            difficulty="easy",
+            skill_tag="s",
+        )
+
+    calls = []
+    qset = QuestionSet(questions=[mcq(1, ["1", "2"]), mcq(2, ["3", "4"]), mcq(3, ["1", "2"])])
+
+    run_worksheet_session(qset, counting_provider(calls))
+
+    assert calls == [1, 2]